@@ -0,0 +1,127 @@
+import time, logging
+from datetime import datetime
+
+from constants import LOGGER
+from helpers import SaveLoader
+from shard_output import OUTPUT_EVENT
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class BOOT_PHASE:
+    SPAWN           = "SPAWN"
+    FIRST_OUTPUT    = "FIRST_OUTPUT"
+    MODS_LOADING    = OUTPUT_EVENT.MODS_LOADING
+    WORLD_LOADING   = OUTPUT_EVENT.WORLD_LOADING
+    SIM_STARTED     = OUTPUT_EVENT.SIM_STARTED
+    WORLD_CONNECTED = OUTPUT_EVENT.WORLD_CONNECTED
+    ONLINE          = OUTPUT_EVENT.ONLINE
+
+# In the order they usually happen.
+BOOT_PHASES = [
+    BOOT_PHASE.SPAWN,
+    BOOT_PHASE.FIRST_OUTPUT,
+    BOOT_PHASE.MODS_LOADING,
+    BOOT_PHASE.WORLD_LOADING,
+    BOOT_PHASE.SIM_STARTED,
+    BOOT_PHASE.WORLD_CONNECTED,
+    BOOT_PHASE.ONLINE,
+]
+
+class BootTimeline():
+    """
+    Time each boot phase of a single shard launch was reached, in seconds since start() was called.
+    Only the first time a phase is reached counts.
+
+    Args:
+        shard (str): the shard code.
+    """
+
+    def __init__(self, shard) -> None:
+        self.shard = shard
+        self.date = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.saved = False
+
+        self.marks = {}
+
+    def mark(self, phase, when=None):
+        """
+        Args:
+            phase (str): one of BOOT_PHASES.
+            when (float, None): time.perf_counter() value of when the phase was reached. Defaults to now.
+
+        Returns:
+            new (bool): False if the phase was already reached.
+        """
+
+        if phase in self.marks:
+            return False
+
+        self.marks[phase] = round((when or time.perf_counter()) - self.started, 3)
+
+        return True
+
+    def get_phases(self):
+        """
+        Returns:
+            phases (list): (phase, seconds) tuples of the phases reached, in the order they were reached.
+        """
+
+        return sorted(self.marks.items(), key=lambda item: item[1])
+
+    @property
+    def complete(self):
+        return BOOT_PHASE.ONLINE in self.marks
+
+    def to_dict(self):
+        return { "date": self.date, "phases": dict(self.get_phases()) }
+
+
+class BootHistory():
+    """ Keeps the last BootTimelines of each shard in savedata/boottimes.json. """
+
+    HISTORY_SIZE = 20
+
+    def __init__(self) -> None:
+        self.save_loader = SaveLoader(filename="boottimes.json")
+
+    def load(self):
+        """
+        Returns:
+            history (dict): shard -> list of BootTimeline.to_dict(), oldest first.
+        """
+
+        try:
+            data = self.save_loader.load()
+
+        except ValueError as e:
+            logger.warning(f"Corrupted boot times file: {e}")
+            return {}
+
+        return data and data.to_dict() or {}
+
+    def add(self, timeline):
+        """
+        Saves a timeline. A timeline is only saved once.
+
+        Args:
+            timeline (BootTimeline): the timeline.
+        """
+
+        if timeline.saved or not timeline.marks:
+            return
+
+        timeline.saved = True
+
+        history = self.load()
+
+        records = history.setdefault(timeline.shard, [])
+        records.append(timeline.to_dict())
+
+        del records[:-self.HISTORY_SIZE]
+
+        self.save_loader.save(**history)
+
+        logger.info(f"{timeline.shard} boot timeline: " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in timeline.get_phases()))
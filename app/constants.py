@@ -70,6 +70,7 @@ class SIZE:
     CLUSTER_STATS = Size(WINDOW_WIDTH / 1.7, 30)
     LOGS_SHOW_END_BUTTON = Size(37, 37)
     LOGS_AUTO_SCROLL_SWITCH = Size(35 * 3, 35)
+    SPARKLINE = Size(60, 18)
 
 SIZE.FRAME = Size(SIZE.SHARD_GROUP.w - FRAME_GAP * 2, (SIZE.SHARD_GROUP.h - FRAME_GAP * 2.5) / 2)
 SIZE.LOGS_BUTTON = Size(SIZE.FRAME.h / 2, SIZE.FRAME.h / 2)
@@ -79,6 +80,7 @@ SIZE.LOGS_TEXTBOX = Size(SIZE.LOGS_PANEL.w - FRAME_GAP * 2, SIZE.LOGS_PANEL.h *
 SIZE.LOGS_TOP_BAR = Size(SIZE.LOGS_TEXTBOX.w, SIZE.LOGS_PANEL.h * 0.09 - FRAME_GAP * 2)
 SIZE.LOGS_ENTRY = Size(SIZE.LOGS_TEXTBOX.w * 0.825 - FRAME_GAP, SIZE.LOGS_PANEL.h - (SIZE.LOGS_TEXTBOX.h + SIZE.LOGS_TOP_BAR.h) - FRAME_GAP * 3)
 SIZE.LOGS_CLOSE = Size(SIZE.LOGS_TEXTBOX.w - SIZE.LOGS_ENTRY.w - FRAME_GAP, SIZE.LOGS_ENTRY.h)
+SIZE.LOGS_SEARCH_BAR = Size(SIZE.LOGS_TEXTBOX.w * 0.55, 40)
 SIZE.SETTINGS_PANEL = Size(WINDOW_WIDTH, CACHED_WINDOW_HEIGHT)
 SIZE.SMALL_BUTTON_LONG = Size(140, SIZE.LAUNCH_BUTTON.h / 2)
 
@@ -102,6 +104,7 @@ OFFSET.LOGS_ENTRY = Pos(FRAME_GAP, OFFSET.LOGS_TEXTBOX.y + SIZE.LOGS_TEXTBOX.h +
 OFFSET.LOGS_CLOSE = Pos(OFFSET.LOGS_ENTRY.x + SIZE.LOGS_ENTRY.w + FRAME_GAP, OFFSET.LOGS_ENTRY.y)
 OFFSET.LOGS_SHOW_END_BUTTON = Pos(SIZE.LOGS_TEXTBOX.w - SIZE.LOGS_SHOW_END_BUTTON.w - FRAME_GAP * 2, SIZE.LOGS_TEXTBOX.h - SIZE.LOGS_SHOW_END_BUTTON.w - FRAME_GAP)
 OFFSET.LOGS_AUTO_SCROLL_SWITCH = Pos(SIZE.LOGS_TEXTBOX.w - SIZE.LOGS_AUTO_SCROLL_SWITCH.w - FRAME_GAP * 3, SIZE.LOGS_AUTO_SCROLL_SWITCH.h/8)
+OFFSET.LOGS_SEARCH_BAR = Pos(OFFSET.LOGS_TEXTBOX.x + SIZE.LOGS_TEXTBOX.w - SIZE.LOGS_SEARCH_BAR.w - FRAME_GAP * 3, OFFSET.LOGS_TEXTBOX.y + FRAME_GAP)
 
 # ------------------------------------------------------------------------------------ #
 
@@ -146,6 +149,7 @@ class COLOR:
     LIGHT_RED = "#fc6a6a"
 
     CONSOLE_GRAY = "#a39191"
+    CONSOLE_SEARCH = "#4a4536"
 
 class SERVER_STATUS:
     OFFLINE  = "OFFLINE"
@@ -1,12 +1,12 @@
 from pathlib import Path
 import winreg, ctypes
-from dataclasses import dataclass
 import ctypes.wintypes
 import webbrowser
 import re, json, sys
 import logging
-import threading
+import collections
 import psutil, os, zipfile
+from tkinter import TclError
 from urllib.parse import quote as encode_for_url
 from customtkinter import set_window_scaling, set_widget_scaling
 
@@ -16,20 +16,6 @@ logger = logging.getLogger(LOGGER)
 
 # ----------------------------------------------------------------------------------------- #
 
-@dataclass
-class TextHighlightData():
-    """
-    Simple dataclass used to highlight text in text box widgets.
-
-    Args:
-        name (str): the indentifier.
-        pattern (re.Pattern): Matched text using this pattern will be highlighted.
-    """
-    name: str
-    pattern: re.Pattern
-
-# ----------------------------------------------------------------------------------------- #
-
 class DotDict:
     """
     Cast a dict into an object with dot notation.
@@ -158,7 +144,7 @@ class SaveLoader:
 
 class PeriodicTask():
     """
-    Executes a function in a loop.
+    Executes a function in a loop, driven by the app Scheduler.
 
     Args:
         app (CTk): window root widget.
@@ -171,56 +157,113 @@ class PeriodicTask():
         args (list): additional parameters to give as parameters to the function call.
     """
     def __init__(self, app, time, func, *args, initial_time=None) -> None:
+        self.task = app.winfo_toplevel().scheduler.add(func, time, *args, initial_time=initial_time)
+
+    def kill(self):
+        """ Stops the loop. """
+
+        self.task.kill()
+
+# ----------------------------------------------------------------------------------------- #
+
+class EventQueue():
+    """
+    App-wide thread-safe queue of callbacks that must run in the Tk main loop.
+    Producers only append to a deque, they never call Tk: Tk calls from other threads wait for the main loop, and would deadlock
+    with a main loop waiting on them. The main loop polls the queue instead, only while producers are registered:
+    with no shard running and no background job, there is no timer at all.
+
+    Args:
+        app (CTk): window root widget.
+    """
+
+    POLL_INTERVAL = 10 # Milliseconds.
+
+    def __init__(self, app) -> None:
         self.app = app
-        self.time = time
-        self.func = func
-        self.args = args
+        self._queue = collections.deque()
+        self._producers = 0
+        self._poll_job = None
+
+    def put(self, func, *args):
+        """
+        Schedules func(*args) to be called in the main loop. Safe to call from any thread, never blocks.
+        The caller must be a registered producer, see add_producer.
+
+        Args:
+            func (function): the function to be called.
+            args (list): parameters to give to the function call.
+        """
 
-        self.id = self.app.after(initial_time or time, self._execute)
+        self._queue.append((func, args))
 
-    def _execute(self, *args):
-        success, newtime = self.func(*self.args)
+    def add_producer(self):
+        """
+        Polls the queue until remove_producer is called as many times. Called in the main loop,
+        before a thread starts putting callbacks: a process is spawned, a job is queued to a worker thread...
+        """
 
-        self.id = None
+        self._producers += 1
 
-        if success:
-            self.id = self.app.after(newtime or self.time, self._execute)
+        if self._poll_job is None:
+            self._poll_job = self.app.after(self.POLL_INTERVAL, self._poll)
 
-    def kill(self):
-        """ Stops the loop. """
+    def remove_producer(self):
+        """ Called in the main loop, usually by the last callback of a producer. What was queued is still drained. """
+
+        self._producers -= 1
 
-        if self.id:
-            #logger.debug(f"Killing periodic task <{self.id}>")
-            self.app.after_cancel(self.id)
+    def _poll(self):
+        self._poll_job = None
+
+        self._drain()
+
+        if self._producers <= 0 and not self._queue:
+            return
+
+        try:
+            self._poll_job = self.app.after(self.POLL_INTERVAL, self._poll)
+
+        except TclError:
+            pass # App is being destroyed.
+
+    def _drain(self):
+        # Only what was queued so far, callbacks queueing more don't keep the main loop here.
+        for _ in range(len(self._queue)):
+            func, args = self._queue.popleft()
+
+            try:
+                func(*args)
+
+            except Exception as e:
+                logger.error(f"EventQueue: {getattr(func, '__qualname__', func)} failed: {e}", exc_info=True)
 
 # ----------------------------------------------------------------------------------------- #
 
-def read_vox_data(server, text):
+VOX_DATA_PATTERN = re.compile(r'VoxLauncherData=({.+})')
+
+def read_vox_data(text):
     """
     Searches "text" trying to find Vox Launcher data.
+    Payloads only carry the fields that changed, so every payload is merged, in order: the last value of each field wins.
 
     Args:
-        server (DedicatedServerShard): shard that is out putting text.
         text (str): text that will be searched for data.
 
     Returns:
         Dict containing the data read or None.
     """
 
-    pattern = re.compile(r'VoxLauncherData=({.+})')
-    matches = pattern.findall(text)
-
-    if not matches:
-        return
+    data = {}
 
-    if len(matches) > 1:
-        # Data overload! Grab new data.
-        server.execute_command("VoxLauncher_GetServerStats()")
+    for string in VOX_DATA_PATTERN.findall(text):
+        try:
+            data.update(json.loads(string.strip()))
 
-    else:
-        string = matches[0].strip()
+        except ValueError as e:
+            logger.warning(f"read_vox_data: invalid payload {string!r}: {e}")
 
-        return json.loads(string)
+    return data or None
 
 # ----------------------------------------------------------------------------------------- #
 
@@ -537,12 +580,37 @@ def get_cluster_name(path):
 
 # ----------------------------------------------------------------------------------------- #
 
-def get_memory_usage(pid):
-    try:
-        process = psutil.Process(pid)
-        return process.memory_info().rss, process.memory_percent()
-    except (psutil.NoSuchProcess, psutil.AccessDenied):
-        return None, None
+def find_external_shard_processes(cluster_dir):
+    """
+    Finds dedicated server processes running a cluster's shards that weren't started by this launcher.
+
+    Args:
+        cluster_dir (str, Path): the cluster path.
+
+    Returns:
+        processes (dict): shard name -> psutil.Process.
+    """
+
+    cluster = get_cluster_name(Path(cluster_dir))
+    own_pid = str(os.getpid())
+    processes = {}
+
+    for process in psutil.process_iter(["name", "cmdline"]):
+        name = process.info["name"] or ""
+        cmdline = process.info["cmdline"] or []
+
+        if not name.startswith("dontstarve_dedicated_server"):
+            continue
+
+        args = dict(zip(cmdline, cmdline[1:]))
+
+        if args.get("-monitor_parent_process") == own_pid:
+            continue # Ours.
+
+        if args.get("-cluster") == cluster and args.get("-shard"):
+            processes[args["-shard"]] = process
+
+    return processes
 
 # ----------------------------------------------------------------------------------------- #
 
@@ -708,22 +776,6 @@ def set_debug_scale(scale):
     set_window_scaling(scale)
     set_widget_scaling(scale)
 
-def read_file_nonblocking(file: Path, callback):
-    def worker():
-        if file.exists():
-            try:
-                content = file.read_text(encoding="utf-8", errors="backslashreplace")
-
-            except Exception as e:
-                logger.warning(f"Failed to read file {file}: {e}")
-                content = ""
-        else:
-            content = ""
-
-        callback(content)
-
-    threading.Thread(target=worker, daemon=True).start()
-
 # ------------------------------------------------------------------------------------------ #
 
 _INVALID_UNICODE_RANGES = [
@@ -0,0 +1,324 @@
+import os, time, logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from constants import LOGGER
+from helpers import SaveLoader, retrieve_launch_data, get_cluster_name
+from strings import STRINGS
+from settings_manager import Settings
+from shard_output import OUTPUT_EVENT
+
+logger = logging.getLogger(LOGGER)
+
+PROCESS_ID = os.getpid()
+
+# ------------------------------------------------------------------------------------ #
+
+class LAUNCH_STRATEGY:
+    PARALLEL       = "PARALLEL"
+    STAGGER_MODS   = "STAGGER_MODS"
+    STAGGER_WORLD  = "STAGGER_WORLD"
+    STAGGER_ONLINE = "STAGGER_ONLINE"
+
+# Master boot phases, in the order they happen.
+BOOT_PHASE_ORDER = [
+    OUTPUT_EVENT.MODS_LOADING,
+    OUTPUT_EVENT.WORLD_LOADING,
+    OUTPUT_EVENT.ONLINE,
+]
+
+# The Master boot phase that releases the other shards, for each staggered strategy.
+# A later phase releases them too, e.g. a cluster without mods never reports MODS_LOADING.
+STAGGER_PHASES = {
+    LAUNCH_STRATEGY.STAGGER_MODS:   OUTPUT_EVENT.MODS_LOADING,
+    LAUNCH_STRATEGY.STAGGER_WORLD:  OUTPUT_EVENT.WORLD_LOADING,
+    LAUNCH_STRATEGY.STAGGER_ONLINE: OUTPUT_EVENT.ONLINE,
+}
+
+@dataclass
+class LaunchPlan():
+    """
+    Simple dataclass holding everything a cluster launch needs, resolved once for all shards.
+
+    Args:
+        strategy (str): one of LAUNCH_STRATEGY.
+        cwd (str): the server executable directory.
+        base_args (list): the command line shared by every shard, without "-shard".
+        shards (list): the ShardFrames to launch, Master first.
+        started (float): time.perf_counter() value of the launch.
+        pending (list): ShardFrames waiting for the Master to reach the stagger phase.
+        online (set): codes of the shards that are online.
+    """
+    strategy: str
+    cwd: str
+    base_args: list
+    shards: list
+    started: float = 0
+    pending: list = field(default_factory=list)
+    online: set = field(default_factory=set)
+
+    def get_arguments(self, shard):
+        """
+        Args:
+            shard (str): the shard code.
+
+        Returns:
+            args (list): the full command line of the shard.
+        """
+
+        return self.base_args[:3] + ["-shard", shard] + self.base_args[3:]
+
+
+class LaunchPlanner():
+    """
+    Launches every shard of the cluster from a single LaunchPlan, either all at once or staggered:
+    the other shards are spawned once the Master reaches a boot phase, so they don't compete for disk and CPU during its boot.
+    The time it took the whole cluster to get online is saved for each strategy.
+
+    Args:
+        app (App): the app root.
+    """
+
+    HISTORY_SIZE = 20
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.plan = None
+
+        self.history_save_loader = SaveLoader(filename="launchtimes.json")
+
+    # ------------------------------------------------------------------------------ #
+
+    def get_strategy(self):
+        strategy = self.app.settings.get(Settings.LAUNCH_STRATEGY)
+
+        if strategy != LAUNCH_STRATEGY.PARALLEL and strategy not in STAGGER_PHASES:
+            logger.warning(f"Unknown launch strategy: {strategy}. Using {LAUNCH_STRATEGY.PARALLEL}.")
+
+            return LAUNCH_STRATEGY.PARALLEL
+
+        return strategy
+
+    def get_arguments(self, launch_data):
+        """
+        Args:
+            launch_data (DotDict): the loaded launch data.
+
+        Returns:
+            args (list): the command line shared by every shard.
+            cwd (str): the server executable directory.
+        """
+
+        game_directory    = Path(self.app.game_entry.get()   )
+        cluster_directory = Path(self.app.cluster_entry.get())
+
+        token = self.app.token_entry.get()
+        cluster = get_cluster_name(cluster_directory)
+
+        cwd = (game_directory / "bin64").resolve()
+        exe = (cwd / "dontstarve_dedicated_server_nullrenderer_x64").resolve()
+
+        if not exe.with_suffix(".exe").exists():
+            # Dev build executable.
+            exe = (cwd / "dontstarve_dedicated_server_r_x64").resolve()
+
+        # LaunchPlan.get_arguments inserts "-shard" after "-cluster".
+        args = f"""
+            {exe}
+            -cluster {cluster}
+            -monitor_parent_process {PROCESS_ID}
+            -token {token}
+        """
+
+        args = args.split()
+
+        if launch_data.ownerdir:
+            args.append("-ownerdir")
+            args.append(launch_data.ownerdir)
+        else:
+            logger.warning("Starting shard: missing user dir.")
+
+        if launch_data.persistent_storage_root:
+            args.append("-persistent_storage_root")
+            args.append(launch_data.persistent_storage_root)
+        else:
+            logger.warning("Starting shard: missing storage root.")
+
+        if launch_data.ugc_directory:
+            args.append("-ugc_directory")
+            args.append(launch_data.ugc_directory)
+        else:
+            logger.warning("Starting shard: missing mods directory.")
+
+        extra_args = self.app.settings.get(Settings.LAUNCH_OPTIONS).split()
+
+        args = args + extra_args
+
+        return args, str(cwd)
+
+    def create_plan(self, shards, strategy):
+        """
+        Validates the entries and loads the launch data, showing the error popups if needed.
+
+        Args:
+            shards (list): the ShardFrames to launch.
+            strategy (str): one of LAUNCH_STRATEGY.
+
+        Returns:
+            plan (LaunchPlan, None): the plan, or None if the cluster can't be launched.
+        """
+
+        game_directory_valid    = self.app.game_entry.validate_text()
+        cluster_directory_valid = self.app.cluster_entry.validate_text()
+
+        if not game_directory_valid or not cluster_directory_valid:
+            invalid_name = not game_directory_valid and STRINGS.ENTRY.GAME_TITLE or STRINGS.ENTRY.CLUSTER_TITLE
+            self.app.error_popup.create(STRINGS.ERROR.DIRECTORY_INVALID.format(directory_name=invalid_name))
+
+            return
+
+        launch_data = self.app.launch_data_save_loader.load()
+
+        if launch_data is None:
+            launch_data = retrieve_launch_data(self.app.cluster_entry.get(), self.app.launch_data_save_loader)
+
+            if launch_data is None:
+                self.app.launch_data_popup.create(STRINGS.ERROR.LAUNCH_DATA_INVALID)
+
+                return
+
+        args, cwd = self.get_arguments(launch_data)
+
+        # Master first, the staggered strategies rely on it.
+        shards = sorted(shards, key=lambda frame: not frame.is_master)
+
+        return LaunchPlan(strategy=strategy, cwd=cwd, base_args=args, shards=shards)
+
+    def launch(self, shards):
+        """
+        Launches the shards using the strategy from the settings.
+
+        Args:
+            shards (list): the ShardFrames to launch.
+        """
+
+        shards = [frame for frame in shards if not frame.server.is_running()]
+
+        if not shards:
+            return
+
+        strategy = self.get_strategy()
+        plan = self.create_plan(shards, strategy)
+
+        if plan is None:
+            return
+
+        logger.info(f"Launching {len(plan.shards)} shard(s), strategy: {strategy}.")
+
+        self.plan = plan
+        plan.started = time.perf_counter()
+
+        if strategy == LAUNCH_STRATEGY.PARALLEL or not plan.shards[0].is_master:
+            self._start_shards(plan, plan.shards)
+            return
+
+        plan.pending = plan.shards[1:]
+
+        for frame in plan.pending:
+            frame.set_starting() # Waiting for the Master.
+
+        self._start_shards(plan, plan.shards[:1])
+
+    def cancel(self):
+        """ Forgets the current plan. Shards still waiting to be spawned go back to offline. """
+
+        plan, self.plan = self.plan, None
+
+        if plan is None:
+            return
+
+        for frame in plan.pending:
+            if not frame.server.is_running():
+                frame.set_offline()
+
+        plan.pending = []
+
+    # ------------------------------------------------------------------------------ #
+
+    def on_boot_phase(self, shard_frame, phase):
+        """
+        Called by DedicatedServerShard when a shard reaches a boot phase.
+
+        Args:
+            shard_frame (ShardFrame): the shard.
+            phase (str): one of BOOT_PHASES. Only BOOT_PHASE_ORDER phases release staggered shards.
+        """
+
+        plan = self.plan
+
+        if plan is None or shard_frame not in plan.shards:
+            return
+
+        if plan.pending and shard_frame.is_master and phase in BOOT_PHASE_ORDER:
+            target = STAGGER_PHASES[plan.strategy]
+
+            if BOOT_PHASE_ORDER.index(phase) >= BOOT_PHASE_ORDER.index(target):
+                pending, plan.pending = plan.pending, []
+
+                logger.info(f"Master reached {phase} after {time.perf_counter() - plan.started:.1f}s, starting the other shards.")
+
+                self._start_shards(plan, pending)
+
+        if phase == OUTPUT_EVENT.ONLINE:
+            plan.online.add(shard_frame.code)
+
+            if len(plan.online) == len(plan.shards):
+                self.plan = None
+
+                self._record(plan, time.perf_counter() - plan.started)
+
+    def _start_shards(self, plan, shards):
+        for frame in shards:
+            frame.server.start(plan.get_arguments(frame.code), plan.cwd)
+
+    # ------------------------------------------------------------------------------ #
+
+    def load_history(self):
+        """
+        Returns:
+            history (dict): strategy -> list of {"seconds", "shards"} records, oldest first.
+        """
+
+        try:
+            data = self.history_save_loader.load()
+
+        except ValueError as e:
+            logger.warning(f"Corrupted launch times file: {e}")
+            return {}
+
+        return data and data.to_dict() or {}
+
+    def get_average_time(self, strategy):
+        """
+        Returns:
+            seconds (float, None): the average time-to-online of strategy, or None if it was never used.
+        """
+
+        records = self.load_history().get(strategy)
+
+        if not records:
+            return
+
+        return sum(record["seconds"] for record in records) / len(records)
+
+    def _record(self, plan, seconds):
+        history = self.load_history()
+
+        records = history.setdefault(plan.strategy, [])
+        records.append({ "seconds": round(seconds, 2), "shards": len(plan.shards) })
+
+        del records[:-self.HISTORY_SIZE]
+
+        self.history_save_loader.save(**history)
+
+        logger.info(f"Cluster online in {seconds:.1f}s, strategy: {plan.strategy} (average {self.get_average_time(plan.strategy):.1f}s).")
@@ -0,0 +1,106 @@
+import os, logging, codecs
+
+from constants import LOGGER
+from shard_output import LineAssembler
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class LogFollower():
+    """
+    Follows a log file written by another process, e.g. the server_log.txt of a shard launched outside of Vox.
+    Each poll costs a stat and a read of the bytes appended since the previous one.
+    The file is tracked by inode: if it's replaced (the game backs it up on launch) or truncated, it's read again from the start.
+
+    Args:
+        path (Path): the log file.
+        on_lines (function): called with a list of complete lines.
+        on_reset (function, None): called when the file was replaced or truncated, before its new lines.
+        on_history (function, None): called instead of on_lines with the lines already in the file when it was first polled.
+    """
+
+    MAX_READ_SIZE = 1024 * 1024 # Per poll, a big file is caught up over several polls.
+
+    def __init__(self, path, on_lines, on_reset=None, on_history=None) -> None:
+        self.path = path
+        self.on_lines = on_lines
+        self.on_reset = on_reset
+        self.on_history = on_history
+
+        self.offset = 0
+        self.inode = None
+        self.history_size = None # Size of the file when first polled, if on_history.
+
+        self._assembler = LineAssembler()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def poll(self):
+        """
+        Reads what was appended to the file since the last poll.
+
+        Returns:
+            pending (bool): True if the file has more bytes than were read, poll again soon.
+        """
+
+        try:
+            stat = os.stat(self.path)
+
+        except OSError:
+            return False # Being replaced, or not created yet.
+
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.offset):
+            logger.debug(f"LogFollower: {self.path} was replaced or truncated.")
+
+            self.offset = 0
+            self.history_size = 0 # A new file, written after the follow started.
+            self._assembler.reset()
+            self._decoder.reset()
+
+            if self.on_reset:
+                self.on_reset()
+
+        self.inode = stat.st_ino
+
+        if self.history_size is None:
+            self.history_size = self.on_history and stat.st_size or 0
+
+        if stat.st_size <= self.offset:
+            return False
+
+        history = self.offset < self.history_size
+
+        # History reads stop at its end, so no chunk mixes both.
+        end = history and self.history_size or stat.st_size
+
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(self.offset)
+                data = file.read(min(end - self.offset, self.MAX_READ_SIZE))
+
+        except OSError as e:
+            logger.warning(f"LogFollower: failed to read {self.path}: {e}")
+            return False
+
+        self.offset += len(data)
+
+        lines = self._assembler.feed(self._decoder.decode(data))
+
+        if lines and history:
+            self.on_history(lines)
+
+        elif lines:
+            self.on_lines(lines)
+
+        return self.offset < stat.st_size
+
+    def flush(self):
+        """ Reads everything left, the writer is done with the file. """
+
+        while self.poll():
+            pass
+
+        lines = self._assembler.feed(self._decoder.decode(b"", final=True)) + self._assembler.flush()
+
+        if lines:
+            self.on_lines(lines)
@@ -0,0 +1,276 @@
+import re, logging, threading, queue
+from bisect import bisect_right
+from itertools import accumulate
+from dataclasses import dataclass
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class TextHighlightData():
+    """
+    Simple dataclass used to highlight text in text box widgets.
+
+    Args:
+        name (str): the indentifier.
+        pattern (re.Pattern): Matched text using this pattern will be highlighted.
+    """
+    name: str
+    pattern: re.Pattern
+
+
+class LineIndex():
+    """
+    Maps character offsets of a text block to Tk "line.column" indices.
+    Line starts are computed once per block, each lookup is a bisect instead of a newline count over the text before it.
+
+    Args:
+        text (str): the text block.
+        start_index (str): the Tk index where the block was inserted.
+    """
+
+    def __init__(self, text, start_index="1.0") -> None:
+        line, column = str(start_index).split(".")
+
+        self.base_line = int(line)
+        self.base_column = int(column)
+
+        self.starts = list(accumulate((len(line) + 1 for line in text.split("\n")[:-1]), initial=0))
+
+    def to_position(self, offset):
+        """ Returns the (line, column) of offset. """
+
+        line = bisect_right(self.starts, offset) - 1
+        column = offset - self.starts[line]
+
+        if line == 0:
+            column += self.base_column
+
+        return self.base_line + line, column
+
+    def to_index(self, offset):
+        return "%d.%d" % self.to_position(offset)
+
+
+class BlockHighlight():
+    """
+    Line oriented state machine for highlights spanning several lines.
+    A block starts at a line matching start_pattern, from the start of its first group, and ends before the next line matching end_pattern.
+    The state is kept between calls to feed, so blocks can continue across text blocks, as long as these end with complete lines.
+
+    Args:
+        name (str): the tag name.
+        start_pattern (str): matched at the start of each line. Its first group is where the highlight starts.
+        end_pattern (str): matched at the start of each line inside a block.
+    """
+
+    def __init__(self, name, start_pattern, end_pattern) -> None:
+        self.name = name
+        self.start_pattern = re.compile(start_pattern)
+        self.end_pattern = re.compile(end_pattern)
+
+        self.active = False
+
+    def reset(self):
+        self.active = False
+
+    def resume(self, context):
+        """
+        Sets the state to the one at the end of context, whatever the state before it.
+        Only the last line of context matching start_pattern or end_pattern matters: the lines after it don't start nor end a block.
+
+        Args:
+            context (str): the text right before the text of the next call to feed, made of complete lines.
+                If none of its lines match, it's taken as outside of any block.
+        """
+
+        self.active = False
+
+        for line in reversed(context.split("\n")):
+            if self.start_pattern.match(line):
+                self.active = True
+                return
+
+            if self.end_pattern.match(line):
+                return
+
+    def feed(self, text):
+        """
+        Args:
+            text (str): the text following the text of the previous call.
+
+        Returns:
+            spans (list): (start, end) character offsets of the block parts in text.
+        """
+
+        spans = []
+        span_start = 0
+        offset = 0
+
+        for line in text.split("\n"):
+            if self.active and self.end_pattern.match(line):
+                self.active = False
+
+                if span_start < offset:
+                    spans.append((span_start, offset))
+
+            if not self.active:
+                match = self.start_pattern.match(line)
+
+                if match:
+                    self.active = True
+                    span_start = offset + match.start(1)
+
+            offset += len(line) + 1
+
+        if self.active and span_start < len(text):
+            spans.append((span_start, len(text)))
+
+        return spans
+
+
+class Highlighter():
+    """
+    Finds the highlight patterns in text blocks and tags them, with a single Tk call per tag.
+    Text blocks are expected in order, each continuing the previous one, unless reset is called.
+    """
+
+    def __init__(self) -> None:
+        self.highlight_data = []
+        self.blocks = []
+
+    def add(self, pattern, name, flags=0):
+        self.highlight_data.append(
+            TextHighlightData(
+                pattern = re.compile(pattern, flags=flags),
+                name = name,
+            )
+        )
+
+    def add_block(self, name, start_pattern, end_pattern):
+        """ See BlockHighlight. """
+
+        self.blocks.append(BlockHighlight(name=name, start_pattern=start_pattern, end_pattern=end_pattern))
+
+    def reset(self, context=""):
+        """
+        Forgets the blocks state, for a text block that doesn't continue the previous one.
+
+        Args:
+            context (str): text right before the next text block, to find out if it starts inside a block. See BlockHighlight.resume.
+        """
+
+        for block in self.blocks:
+            block.resume(context)
+
+    def find_spans(self, text):
+        """
+        Args:
+            text (str): the text block.
+
+        Returns:
+            spans (dict): tag name -> list of (start, end) character offsets.
+        """
+
+        spans = {}
+
+        for highlight in self.highlight_data:
+            spans[highlight.name] = [match.span() for match in highlight.pattern.finditer(text)]
+
+        for block in self.blocks:
+            spans[block.name] = block.feed(text)
+
+        return spans
+
+    def apply(self, textbox, start_index, text):
+        """
+        Highlights text that was inserted in textbox at start_index.
+
+        Args:
+            textbox (tkinter.Text): the text widget.
+            start_index (str): the Tk index where text starts.
+            text (str): the inserted text.
+        """
+
+        self.apply_spans(textbox, LineIndex(text, start_index), self.find_spans(text))
+
+    def apply_spans(self, textbox, index, spans):
+        """
+        Args:
+            textbox (tkinter.Text): the text widget.
+            index (LineIndex): the index of the text block the spans come from.
+            spans (dict): tag name -> list of (start, end) character offsets.
+        """
+
+        for name, ranges in spans.items():
+            if not ranges:
+                continue
+
+            args = []
+
+            for start, end in ranges:
+                args.append(index.to_index(start))
+                args.append(index.to_index(end))
+
+            # "tag add" takes any number of ranges.
+            textbox.tag_add(name, *args)
+
+# ------------------------------------------------------------------------------------ #
+
+class HighlightWorker():
+    """
+    Background thread running the pattern matching of Highlighters, so log bursts don't block the main loop.
+    Jobs run in the order they were queued, which keeps the block highlights state consistent.
+    """
+
+    def __init__(self) -> None:
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, highlighter, text, context, callback):
+        """
+        Finds the highlights of text in the worker thread.
+
+        Args:
+            highlighter (Highlighter): only used by this thread from now on.
+            text (str): the text block, made of complete lines.
+            context (str, None): if not None, the highlighter is reset with it first. See Highlighter.reset.
+            callback (function): called in the worker thread with a list of (tag, start, end) spans,
+                start and end being (line, column) tuples, lines 0 based and relative to the text block.
+                Always called, with no spans if finding them failed.
+        """
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="HighlightWorker", daemon=True)
+                self._thread.start()
+
+        self._queue.put((highlighter, text, context, callback))
+
+    def _run(self):
+        while True:
+            highlighter, text, context, callback = self._queue.get()
+
+            try:
+                if context is not None:
+                    highlighter.reset(context=context)
+
+                index = LineIndex(text, start_index="0.0")
+                spans = []
+
+                for name, ranges in highlighter.find_spans(text).items():
+                    for start, end in ranges:
+                        spans.append((name, index.to_position(start), index.to_position(end)))
+
+            except Exception as e:
+                logger.error(f"HighlightWorker: {e}")
+
+                spans = []
+
+            callback(spans)
+
+HIGHLIGHT_WORKER = HighlightWorker()
@@ -0,0 +1,435 @@
+import os, logging, threading, queue, collections
+from dataclasses import dataclass
+from array import array
+from itertools import accumulate
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+# Words are runs of lowercase letters and "_", anything else becomes a space.
+# Numbers aren't indexed, they would make most of the index.
+_WORD_TABLE = bytes((97 <= c <= 122 or c == 95) and c or 32 for c in range(256))
+
+def _get_words(data):
+    """ Returns the set of words of lowercase data with 3 characters or more. """
+
+    return {word for word in set(data.translate(_WORD_TABLE).split()) if len(word) >= 3}
+
+_trigrams_cache = {}
+
+def _get_trigrams(word):
+    trigrams = _trigrams_cache.get(word)
+
+    if trigrams is None:
+        if len(_trigrams_cache) > 100000:
+            _trigrams_cache.clear()
+
+        trigrams = _trigrams_cache[word] = frozenset(word[i:i+3] for i in range(len(word) - 2))
+
+    return trigrams
+
+def get_query_trigrams(needle):
+    """
+    Args:
+        needle (bytes): the lowercase query.
+
+    Returns:
+        trigrams (set): trigrams every line containing needle has in its words.
+    """
+
+    trigrams = set()
+
+    for word in _get_words(needle):
+        trigrams |= _get_trigrams(word)
+
+    return trigrams
+
+
+class LogIndex():
+    """
+    Inverted index of log lines, for case insensitive substring search.
+    Lines are grouped in blocks of BLOCK_LINES. Each trigram of the words of a block maps to the list of blocks that contain it,
+    so a query only reads the blocks that contain every trigram of its words, and the lines not in a full block yet.
+
+    Lines are added in order, and read back through a function, the index doesn't keep their text.
+    """
+
+    BLOCK_LINES = 128
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self):
+        self.postings = {} # trigram -> array('I') of block numbers.
+        self.lines = 0
+        self.blocks = 0
+
+        self._pending = [] # Lowercase lines of the incomplete last block.
+
+    def add(self, lines, continued=False, read=None):
+        """
+        Args:
+            lines (list): complete lines, str or bytes.
+            continued (bool): if True, the first line is the end of the last one added, see LineStore.partial.
+            read (function): same as in search, with the lines already stored. Required if continued, to read back the whole line.
+        """
+
+        if not lines:
+            return
+
+        if isinstance(lines[0], str):
+            lines = [line.encode("utf-8") for line in lines]
+
+        lines = [line.lower() for line in lines]
+
+        if continued and self.lines:
+            line = lines.pop(0)
+
+            if self._pending:
+                self._pending[-1] += line
+            else:
+                # Its line is the last of the last full block. The whole line is indexed again, a word can span both parts.
+                self._add_block(read(self.lines - 1, self.lines).lower(), block=self.blocks - 1)
+
+        self._add_lowercase(lines)
+
+    def _add_lowercase(self, lines):
+        self.lines += len(lines)
+        self._pending.extend(lines)
+
+        while len(self._pending) >= self.BLOCK_LINES:
+            self._add_block(b"\n".join(self._pending[:self.BLOCK_LINES]))
+
+            del self._pending[:self.BLOCK_LINES]
+
+    def _add_block(self, data, block=None):
+        """ Indexes data as a new block, or as more text of block. """
+
+        trigrams = set()
+
+        for word in _get_words(data):
+            trigrams |= _get_trigrams(word)
+
+        if block is None:
+            block = self.blocks
+            self.blocks += 1
+
+        for trigram in trigrams:
+            blocks = self.postings.get(trigram)
+
+            if blocks is None:
+                blocks = self.postings[trigram] = array("I")
+
+            if not blocks or blocks[-1] != block:
+                blocks.append(block)
+
+    def get_candidate_blocks(self, needle):
+        """
+        Returns:
+            blocks (list, range): sorted block numbers that may contain needle.
+        """
+
+        trigrams = get_query_trigrams(needle)
+
+        if not trigrams:
+            return range(self.blocks) # Nothing to filter with, every block is read.
+
+        postings = sorted((self.postings.get(trigram, ()) for trigram in trigrams), key=len)
+
+        blocks = set(postings[0])
+
+        for other in postings[1:]:
+            if not blocks:
+                break
+
+            blocks.intersection_update(other)
+
+        return sorted(blocks)
+
+    def search(self, query, read):
+        """
+        Args:
+            query (str): the text to find, case insensitive.
+            read (function): read(start, stop) returns the lines [start, stop) as bytes, with their line endings.
+
+        Yields:
+            line (int): number of each line containing query, in order.
+        """
+
+        for lines in self.search_blocks(query, read):
+            yield from lines
+
+    def search_blocks(self, query, read):
+        """
+        Same as search, a block at a time, so callers can stop between blocks.
+
+        Yields:
+            lines (list): numbers of the lines of a block containing query, in order. Empty if none does.
+        """
+
+        needle = query.encode("utf-8").lower()
+
+        if not needle:
+            return
+
+        for block in self.get_candidate_blocks(needle):
+            start = block * self.BLOCK_LINES
+
+            yield self._scan(needle, start, start + self.BLOCK_LINES, read)
+
+        yield self._scan(needle, self.blocks * self.BLOCK_LINES, self.lines, read)
+
+    def _scan(self, needle, start, stop, read):
+        if start >= stop:
+            return []
+
+        data = read(start, stop).lower()
+
+        if needle not in data:
+            return []
+
+        return [start + i for i, line in enumerate(data.split(b"\n")) if needle in line]
+
+
+class FileIndex(LogIndex):
+    """
+    LogIndex of a log file on disk, that also keeps where each line starts.
+    update indexes what was appended to the file since the last call. If the file was replaced or truncated, it's indexed again.
+
+    Args:
+        path (Path): the log file.
+    """
+
+    READ_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.inode = None
+
+        super().__init__()
+
+    def clear(self):
+        super().clear()
+
+        self.offsets = array("Q")
+        self.size = 0 # Bytes indexed, complete lines only.
+
+    def update(self, cancelled=None):
+        """
+        Args:
+            cancelled (function, None): checked between reads, indexing stops if it returns True. What was read stays indexed.
+        """
+
+        try:
+            stat = os.stat(self.path)
+
+        except OSError:
+            # Deleted: nothing left to search.
+            self.clear()
+            self.inode = None
+
+            return
+
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.size):
+            self.clear()
+
+        self.inode = stat.st_ino
+
+        if stat.st_size <= self.size:
+            return
+
+        with open(self.path, "rb") as file:
+            file.seek(self.size)
+
+            carry = b""
+
+            while not (cancelled and cancelled()):
+                data = file.read(self.READ_SIZE)
+
+                if not data:
+                    break
+
+                data = carry + data
+                end = data.rfind(b"\n") + 1
+
+                data, carry = data[:end], data[end:]
+
+                if not data:
+                    continue
+
+                lines = data.lower().split(b"\n")
+                lines.pop() # Empty, after the last line ending.
+
+                self.offsets.extend(accumulate((len(line) + 1 for line in lines[:-1]), initial=self.size))
+                self.size += len(data)
+
+                self._add_lowercase(lines)
+
+    def read(self, start, stop, file=None):
+        """ Reads the lines [start, stop), as bytes. """
+
+        start = max(0, start)
+        stop = min(len(self.offsets), stop)
+
+        if start >= stop:
+            return b""
+
+        begin = self.offsets[start]
+        end = stop < len(self.offsets) and self.offsets[stop] or self.size
+
+        if file is None:
+            with open(self.path, "rb") as file:
+                file.seek(begin)
+                return file.read(end - begin)
+
+        file.seek(begin)
+
+        return file.read(end - begin)
+
+    def search(self, query):
+        with open(self.path, "rb") as file:
+            yield from super().search(query, lambda start, stop: self.read(start, stop, file))
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class SearchResult():
+    """
+    Simple dataclass with a line found by a search.
+
+    Args:
+        shard (str): the shard code.
+        source (str): where the line comes from, for display.
+        store (LineStore, SegmentStore, LogFileStore): the store that holds the line.
+        line (int): the line index in the store.
+    """
+    shard: str
+    source: str
+    store: object
+    line: int
+
+
+class SearchWorker():
+    """
+    Background thread that indexes log files on disk and searches them, one search at a time.
+    Indexes are kept for the next searches, and only updated with what was appended to their files since.
+    At most MAX_INDEXES are kept, the least recently searched ones are dropped, as well as the ones of deleted files.
+    """
+
+    BATCH_SIZE = 200 # Results handed at once.
+    MAX_INDEXES = 32
+
+    def __init__(self) -> None:
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._generations = {} # Owner -> generation of its last search. A new search cancels the running one of the same owner.
+
+        self._indexes = collections.OrderedDict() # Path -> FileIndex, least recently searched first, worker thread side.
+
+    def search(self, query, paths, callback, limit, owner=None):
+        """
+        Searches files in the worker thread. The running search of owner, if any, is cancelled.
+
+        Args:
+            query (str): the text to find.
+            paths (list): the files to search, in order.
+            callback (function): called in the worker thread with (results, done), results being a list of (FileIndex, line).
+                Called at least once, with done True at the end. A cancelled search ends with no results.
+            limit (int): maximum number of results.
+            owner (object): whoever started the search, e.g. its log panel. Searches of other owners aren't cancelled.
+        """
+
+        with self._lock:
+            generation = self._generations[owner] = self._generations.get(owner, 0) + 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SearchWorker", daemon=True)
+                self._thread.start()
+
+        self._queue.put((owner, generation, query, paths, callback, limit))
+
+    def cancel(self, owner=None):
+        """ Cancels the running search of owner, if any. """
+
+        with self._lock:
+            self._generations[owner] = self._generations.get(owner, 0) + 1
+
+    def _run(self):
+        while True:
+            owner, generation, query, paths, callback, limit = self._queue.get()
+
+            cancelled = lambda: generation != self._generations.get(owner)
+
+            results = []
+
+            try:
+                results = self._search(query, paths, callback, limit, cancelled)
+
+            except Exception as e:
+                logger.error(f"SearchWorker: {e}")
+
+            callback(not cancelled() and results or [], True)
+
+    def _search(self, query, paths, callback, limit, cancelled):
+        results = []
+        count = 0
+
+        for path in paths:
+            if cancelled():
+                return []
+
+            index = self._get_index(path)
+
+            try:
+                index.update(cancelled)
+
+                if index.inode is None:
+                    del self._indexes[path] # The file doesn't exist.
+                    continue
+
+                for line in index.search(query):
+                    results.append((index, line))
+                    count += 1
+
+                    if len(results) >= self.BATCH_SIZE:
+                        if cancelled():
+                            return []
+
+                        callback(results, False)
+                        results = []
+
+                    if count >= limit:
+                        break
+
+            except OSError as e:
+                logger.warning(f"SearchWorker: failed to read {path}: {e}")
+
+            if count >= limit:
+                break
+
+        return results
+
+    def _get_index(self, path):
+        index = self._indexes.get(path)
+
+        if index is not None:
+            self._indexes.move_to_end(path)
+            return index
+
+        # Segments get pruned, and server_log.txt replaced: drop what was deleted before making room.
+        for other in [other for other in self._indexes if not os.path.exists(other)]:
+            del self._indexes[other]
+
+        while len(self._indexes) >= self.MAX_INDEXES:
+            self._indexes.popitem(last=False)
+
+        index = self._indexes[path] = FileIndex(path)
+
+        return index
+
+SEARCH_WORKER = SearchWorker()
@@ -0,0 +1,605 @@
+import logging, threading, queue, atexit, mmap, collections
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from constants import LOGGER
+from shard_output import decode_output
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+# Bytes of output a store holds in memory. Past it, lines are dropped and counted instead of stored:
+# a flooding shard, or a disk that stopped accepting writes, can't grow the launcher memory without limit.
+MAX_MEMORY_SIZE = 64 * 1024 * 1024
+
+def _encode_lines(lines, continued=False):
+    """
+    Joins lines into bytes, with the offset of each line start relative to the joined data.
+    If continued, the first line is the end of the previous one, and has no offset.
+    """
+
+    if isinstance(lines[0], str):
+        lines = [line.encode("utf-8") for line in lines]
+
+    offsets = array("Q", accumulate(map(len, lines[:-1]), initial=0))
+
+    if continued:
+        del offsets[0]
+
+    return b"".join(lines), offsets
+
+class LineStore():
+    """
+    Append-only store of output lines.
+    The raw text lives in a single bytearray, and an array('Q') holds the offset where each line starts,
+    so any range of lines is a single slice, and the per-line overhead is 8 bytes instead of a Python object.
+    Holds up to MAX_MEMORY_SIZE bytes. Past it, the oldest lines are dropped, a quarter of it at once,
+    and read as empty lines, so the line numbers the view, the index and the highlights use don't change.
+    """
+
+    def __init__(self) -> None:
+        self._data = bytearray()
+        self._offsets = array("Q") # Offsets since the first line ever stored.
+
+        self._first = 0 # First line still held, the ones before were dropped.
+        self._start = 0 # Offset of the first held line, where _data begins.
+
+        self.partial = False # The last line has no line ending yet, the next append continues it.
+        self.dropped = 0     # Oldest lines dropped because the store was full.
+        self.peak = 0        # Most bytes held at once.
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self):
+        """ Size of the stored text, in bytes. """
+
+        return len(self._data)
+
+    def append(self, lines):
+        """
+        Args:
+            lines (list): output lines, str or bytes, see LineAssembler.feed. The last one may have no line ending, the next append continues it.
+
+        Returns:
+            stored (bool): always True, the oldest lines are dropped to make room.
+        """
+
+        if not lines:
+            return True
+
+        data, offsets = _encode_lines(lines, continued=self.partial)
+
+        if len(self._data) + len(data) > MAX_MEMORY_SIZE:
+            self._drop_oldest(max(len(self._data) + len(data) - MAX_MEMORY_SIZE, MAX_MEMORY_SIZE // 4))
+
+        base = self._start + len(self._data)
+
+        self._offsets.extend(offset + base for offset in offsets)
+        self._data += data
+
+        self.partial = not data.endswith(b"\n")
+        self.peak = max(self.peak, len(self._data))
+
+        return True
+
+    def _drop_oldest(self, size):
+        """ Drops the oldest lines, at least size bytes of them. A line still being continued is kept. """
+
+        last = len(self._offsets) - (self.partial and 1 or 0)
+        first = bisect_left(self._offsets, self._start + size, self._first, last)
+
+        end = self._offsets[first] if first < len(self._offsets) else self._start + len(self._data)
+
+        del self._data[:end - self._start]
+
+        self.dropped += first - self._first
+        self._first = first
+        self._start = end
+
+    def get_raw(self, start, stop):
+        """
+        Args:
+            start (int): index of the first line.
+            stop (int): index after the last line.
+
+        Returns:
+            data (bytes): the lines, with their line endings.
+        """
+
+        start = max(0, start)
+        stop = min(len(self._offsets), stop)
+
+        if start >= stop:
+            return b""
+
+        # Dropped lines read as empty lines.
+        data = b"\n" * (min(stop, self._first) - start) if start < self._first else b""
+        start = max(start, self._first)
+
+        if start >= stop:
+            return data
+
+        begin = self._offsets[start] - self._start
+        end = self._offsets[stop] - self._start if stop < len(self._offsets) else len(self._data)
+
+        data += self._data[begin:end]
+
+        # Lines the view expects complete, even one still being continued.
+        if stop == len(self._offsets) and self.partial:
+            data += b"\n"
+
+        return data
+
+    def get_text(self, start, stop):
+        """ Same as get_raw, decoded. """
+
+        return decode_output(self.get_raw(start, stop))
+
+    def clear(self):
+        self._data = bytearray()
+        self._offsets = array("Q")
+
+        self._first = 0
+        self._start = 0
+
+        self.partial = False
+        self.dropped = 0
+        self.peak = 0
+
+    def close(self):
+        self.clear()
+
+# ------------------------------------------------------------------------------------ #
+
+class LogFileStore():
+    """
+    Read-only store over a log file, loaded from its end.
+    Only the start offsets of the loaded lines are kept. Older lines are found reading the file backwards
+    in blocks on demand, so opening a huge file costs the same as opening a small one.
+    The file isn't kept open between reads, the game can still rename it to back it up.
+
+    Args:
+        path (Path): the log file.
+        offsets (array, None): start offsets of every line of the file, if already known (see FileIndex). The store is then complete.
+        size (int, None): the file size the offsets refer to. Required with offsets.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, path, offsets=None, size=None) -> None:
+        self.path = path
+
+        # Never continued nor dropped, same interface as the other stores.
+        self.partial = False
+        self.dropped = 0
+        self.peak = 0
+
+        if offsets is not None:
+            self._offsets = offsets
+            self._size = size
+            self._start = 0
+
+            return
+
+        try:
+            self._size = path.stat().st_size
+
+        except OSError:
+            self._size = 0
+
+        self._offsets = array("Q")
+        self._start = self._size # Offset of the first loaded line.
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self):
+        """ Size of the loaded text, in bytes. """
+
+        return self._size - self._start
+
+    @property
+    def complete(self):
+        """ True if every line of the file was loaded. """
+
+        return self._start == 0
+
+    def load_older(self, count):
+        """
+        Loads lines before the loaded ones. They are inserted at the start of the store.
+
+        Args:
+            count (int): number of lines to load.
+
+        Returns:
+            count (int): number of lines loaded, less than asked at the start of the file.
+        """
+
+        if self.complete or count <= 0:
+            return 0
+
+        starts = []
+
+        # The line before the first loaded one ends right before it, the search starts before that line ending.
+        end = self._start - 1
+
+        try:
+            with open(self.path, "rb") as file:
+                while len(starts) < count:
+                    if end <= 0:
+                        starts.append(0)
+                        break
+
+                    block_start = max(0, end - self.BLOCK_SIZE)
+
+                    file.seek(block_start)
+                    data = file.read(end - block_start)
+
+                    pos = len(data)
+
+                    while len(starts) < count:
+                        pos = data.rfind(b"\n", 0, pos)
+
+                        if pos == -1:
+                            break
+
+                        starts.append(block_start + pos + 1)
+
+                    end = block_start
+
+        except OSError as e:
+            logger.warning(f"Failed to read file {self.path}: {e}")
+            return 0
+
+        if not starts:
+            return 0
+
+        starts.reverse()
+
+        self._offsets = array("Q", starts) + self._offsets
+        self._start = starts[0]
+
+        return len(starts)
+
+    def get_raw(self, start, stop):
+        """
+        Args:
+            start (int): index of the first line.
+            stop (int): index after the last line.
+
+        Returns:
+            data (bytes): the lines, with their line endings.
+        """
+
+        start = max(0, start)
+        stop = min(len(self._offsets), stop)
+
+        if start >= stop:
+            return b""
+
+        begin = self._offsets[start]
+        end = stop < len(self._offsets) and self._offsets[stop] or self._size
+
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(begin)
+                data = file.read(end - begin)
+
+        except OSError as e:
+            logger.warning(f"Failed to read file {self.path}: {e}")
+            return b""
+
+        # Lines the view expects complete, even the last one.
+        if not data.endswith(b"\n"):
+            data += b"\n"
+
+        return data
+
+    def get_text(self, start, stop):
+        """ Same as get_raw, decoded. """
+
+        return decode_output(self.get_raw(start, stop))
+
+    def close(self):
+        pass
+
+# ------------------------------------------------------------------------------------ #
+
+class SegmentWriter():
+    """
+    Background thread that appends to segment files, so the main loop never waits on disk.
+    Every write queued while the thread was busy is flushed together.
+    """
+
+    def __init__(self) -> None:
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, func, *args):
+        """ Runs func(*args) in the writer thread. """
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SegmentWriter", daemon=True)
+                self._thread.start()
+
+                atexit.register(self.close)
+
+        self._queue.put((func, args))
+
+    def close(self, timeout=5):
+        """ Writes everything queued, then stops the thread. """
+
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+
+            dirty = set()
+
+            for item in items:
+                if item is None:
+                    for store in dirty:
+                        store._flush()
+                    return
+
+                func, args = item
+
+                try:
+                    if func(*args):
+                        dirty.add(func.__self__)
+
+                except OSError as e:
+                    logger.error(f"SegmentWriter: {e}")
+
+            for store in dirty:
+                try:
+                    store._flush()
+
+                except OSError as e:
+                    logger.error(f"SegmentWriter: {e}")
+
+SEGMENT_WRITER = SegmentWriter()
+
+def prune_segments(directory, keep):
+    """
+    Deletes the oldest segments of a directory. Segment names sort by date.
+
+    Args:
+        directory (Path): the segments directory.
+        keep (int): number of segments to keep.
+    """
+
+    if not directory.exists():
+        return
+
+    segments = sorted(directory.glob("*.log"))
+
+    for segment in segments[:max(0, len(segments) - keep)]:
+        segment.unlink(missing_ok=True)
+        segment.with_suffix(".idx").unlink(missing_ok=True)
+
+
+class SegmentStore():
+    """
+    Same interface as LineStore, backed by a segment file on disk.
+    The text is appended to "<name>.log" and the line start offsets to "<name>.idx", an array('Q') file, through SEGMENT_WRITER.
+    Reads go through mmap, so any line is a slice of the mapped file, and only the offsets and the not yet written text stay in memory.
+    While MAX_MEMORY_SIZE bytes are waiting to be written, e.g. the disk is full, later lines are dropped.
+    Unlike LineStore, the oldest can't be: the file offsets of the lines after them are already queued to the .idx file,
+    and the writer queue keeps a reference to their data until it is written, so dropping them would free nothing.
+
+    Args:
+        path (Path): the segment file, with the .log suffix.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.index_path = path.with_suffix(".idx")
+
+        self._offsets = array("Q")
+        self._size = 0
+
+        self._pending = collections.deque() # (offset, data) not yet flushed to the file, main loop side.
+        self._written = 0                   # Bytes flushed to the file, set by the writer thread.
+
+        self.partial = False # The last line has no line ending yet, the next append continues it.
+        self.dropped = 0     # Lines dropped because too much was waiting to be written.
+        self.peak = 0        # Most bytes waiting to be written at once.
+
+        self._file = None
+        self._map = None
+
+        self._log_file = None   # Writer thread side.
+        self._index_file = None
+        self._unflushed = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self):
+        return self._size
+
+    def append(self, lines):
+        """
+        Args:
+            lines (list): output lines, str or bytes, see LineAssembler.feed. The last one may have no line ending, the next append continues it.
+
+        Returns:
+            stored (bool): False if the lines were dropped.
+        """
+
+        if not lines:
+            return True
+
+        data, offsets = _encode_lines(lines, continued=self.partial)
+
+        self._trim_pending()
+
+        if self._size + len(data) - self._written > MAX_MEMORY_SIZE:
+            self.dropped += len(offsets)
+
+            if self.partial:
+                self._store(b"\n", array("Q")) # Ends the stored part of the line, the rest is dropped.
+
+            return False
+
+        self._store(data, offsets)
+
+        self.peak = max(self.peak, self._size - self._written)
+
+        return True
+
+    def get_raw(self, start, stop):
+        """
+        Args:
+            start (int): index of the first line.
+            stop (int): index after the last line.
+
+        Returns:
+            data (bytes): the lines, with their line endings.
+        """
+
+        start = max(0, start)
+        stop = min(len(self._offsets), stop)
+
+        if start >= stop:
+            return b""
+
+        begin = self._offsets[start]
+        end = stop < len(self._offsets) and self._offsets[stop] or self._size
+
+        data = self._read(begin, end)
+
+        # Lines the view expects complete, even one still being continued.
+        if stop == len(self._offsets) and self.partial:
+            data += b"\n"
+
+        return data
+
+    def get_text(self, start, stop):
+        """ Same as get_raw, decoded. """
+
+        return decode_output(self.get_raw(start, stop))
+
+    def close(self):
+        """ Closes the mapping. The files are closed once everything queued was written. """
+
+        if self.partial:
+            self._store(b"\n", array("Q")) # Won't be continued, the file ends with a complete line.
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        SEGMENT_WRITER.put(self._close_files)
+
+    # Main loop side.
+
+    def _store(self, data, offsets):
+        for i in range(len(offsets)):
+            offsets[i] += self._size
+
+        self._offsets.extend(offsets)
+        self._pending.append((self._size, data))
+        self._size += len(data)
+
+        self.partial = not data.endswith(b"\n")
+
+        SEGMENT_WRITER.put(self._write, data, offsets)
+
+    def _trim_pending(self):
+        """ Forgets the pending data already written, it can be read from the file now. Returns the written size. """
+
+        written = self._written
+
+        while self._pending and self._pending[0][0] + len(self._pending[0][1]) <= written:
+            self._pending.popleft()
+
+        return written
+
+    def _read(self, begin, end):
+        written = self._trim_pending()
+
+        parts = []
+
+        if begin < written:
+            parts.append(self._read_mapped(begin, min(end, written)))
+
+        for offset, data in self._pending:
+            if offset >= end:
+                break
+
+            if offset + len(data) > begin:
+                parts.append(data[max(0, begin - offset) : end - offset])
+
+        return b"".join(parts)
+
+    def _read_mapped(self, begin, end):
+        if self._map is None or end > len(self._map):
+            # The file grew since it was mapped.
+            if self._map is not None:
+                self._map.close()
+
+            if self._file is None:
+                self._file = open(self.path, "rb")
+
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._map[begin:end]
+
+    # Writer thread side.
+
+    def _write(self, data, offsets):
+        if self._log_file is None:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+
+            self._log_file = open(self.path, "ab")
+            self._index_file = open(self.index_path, "ab")
+
+        self._log_file.write(data)
+        offsets.tofile(self._index_file)
+
+        self._unflushed += len(data)
+
+        return True
+
+    def _flush(self):
+        if self._log_file is None:
+            return
+
+        self._log_file.flush()
+        self._index_file.flush()
+
+        self._written += self._unflushed
+        self._unflushed = 0
+
+    def _close_files(self):
+        if self._log_file is None:
+            return
+
+        self._flush()
+
+        self._log_file.close()
+        self._index_file.close()
+
+        self._log_file = self._index_file = None
@@ -0,0 +1,81 @@
+-- Performance telemetry of this shard, sent every {{interval}} seconds.
+
+local TELEMETRY_INTERVAL = {{interval}}
+
+local GetWallTime = GetTimeRealSeconds or os.time
+
+local function SendData(data)
+    print(string.format("VoxLauncherData=%s", json.encode(data)))
+end
+
+local function GetEntityCount()
+    local count = 0
+
+    for _ in pairs(Ents) do
+        count = count + 1
+    end
+
+    return count
+end
+
+local function GetPings()
+    local pings = {}
+
+    for _, client in ipairs(TheNet:GetClientTable() or {}) do
+        -- The dedicated server itself is in the table too.
+        if client.performance == nil and client.ping ~= nil then
+            pings[client.name or client.userid] = client.ping
+        end
+    end
+
+    return pings
+end
+
+local last_sim_time = GetTime()
+local last_wall_time = GetWallTime()
+local last_tick = GetTick()
+local last_save_duration = nil
+
+local function SendTelemetry()
+    local sim_time, wall_time, tick = GetTime(), GetWallTime(), GetTick()
+
+    SendData({
+        telemetry = {
+            heap      = collectgarbage("count"),
+            entities  = GetEntityCount(),
+            sim_time  = sim_time - last_sim_time,
+            wall_time = wall_time - last_wall_time,
+            ticks     = tick - last_tick,
+            tick_time = TheSim:GetTickTime(),
+            pings     = GetPings(),
+            save      = last_save_duration,
+        },
+    })
+
+    last_sim_time, last_wall_time, last_tick = sim_time, wall_time, tick
+    last_save_duration = nil
+end
+
+local function HookSaveGame()
+    local _SaveGame = SaveGame
+
+    SaveGame = function(isshutdown, cb, ...)
+        local start = GetWallTime()
+
+        return _SaveGame(isshutdown, function(...)
+            last_save_duration = GetWallTime() - start
+
+            if cb ~= nil then
+                return cb(...)
+            end
+        end, ...)
+    end
+end
+
+if TheWorld._vox_telemetry_task ~= nil then
+    TheWorld._vox_telemetry_task:Cancel()
+else
+    HookSaveGame()
+end
+
+TheWorld._vox_telemetry_task = TheWorld:DoPeriodicTask(TELEMETRY_INTERVAL, SendTelemetry)
@@ -14,24 +14,68 @@ local function GetCurrentDay()
     return TheWorld.state.cycles + 1
 end
 
+local DATA_FIELDS = {
+    players = GetNumPlayers,
+    season  = GetSeason,
+    day     = GetCurrentDay,
+}
+
+-- Changed fields are sent together, at most once per interval, with their values at that time.
+local FLUSH_INTERVAL = 2
+
+local dirty_fields = {}
+local flush_task = nil
+
+local function FlushData()
+    flush_task = nil
+
+    local data = {}
+
+    for field in pairs(dirty_fields) do
+        data[field] = DATA_FIELDS[field]()
+    end
+
+    dirty_fields = {}
+
+    if next(data) ~= nil then
+        SendData(data)
+    end
+end
+
+local function MarkDirty(field)
+    dirty_fields[field] = true
+
+    if flush_task == nil then
+        flush_task = TheWorld:DoTaskInTime(FLUSH_INTERVAL, FlushData)
+    end
+end
+
+local function FlushDataNow()
+    if flush_task ~= nil then
+        flush_task:Cancel()
+    end
+
+    FlushData()
+end
+
 local function SendInitialData()
-    SendData({
-        players = GetNumPlayers(),
-        season  = GetSeason(),
-        day     = GetCurrentDay(),
-    })
+    for field in pairs(DATA_FIELDS) do
+        dirty_fields[field] = true
+    end
+
+    FlushDataNow()
 end
 
 local function OnPlayerCountChanged(world, data)
-    SendData({ players = GetNumPlayers() })
+    MarkDirty("players")
 end
 
 local function OnSeasonChanged(world, season)
-    SendData({ season = GetSeason() })
+    MarkDirty("season")
 end
 
 local function OnDayChanged(world, cycles)
-    SendData({ day = GetCurrentDay() })
+    MarkDirty("day")
 end
 
 local VOX_SERVER_TAG = "󰀜 vox launcher · {{lang_code}} · {{version}} 󰀜"
@@ -60,6 +104,10 @@ if not TheWorld._vox_launcher then
 end
 
 VoxLauncher_GetServerStats = SendInitialData
-VoxLauncher_UpdatePlayerCount = OnPlayerCountChanged
+-- Called when the sim pauses, tasks won't run until it resumes.
+VoxLauncher_UpdatePlayerCount = function()
+    MarkDirty("players")
+    FlushDataNow()
+end
 
 SendInitialData()
\ No newline at end of file
@@ -13,6 +13,11 @@ from helpers import *
 from strings import STRINGS
 from fonts import FONT
 from settings_manager import SettingsManager, Settings
+from shard_supervisor import ShardSupervisor
+from metrics_collector import MetricsCollector
+from scheduler import Scheduler
+from launch_planner import LaunchPlanner
+from boot_timeline import BootHistory
 
 from widgets.buttons import CustomButton, ImageButton
 from widgets.entries import TokenEntry, DirectoryEntry, ClusterDirectoryEntry
@@ -115,6 +120,13 @@ class App(CTk):
         self.entries_save_loader = SaveLoader(filename="entries.json")
         self.launch_data_save_loader = SaveLoader(filename="launchdata.json")
 
+        self.scheduler = Scheduler(app=self)
+        self.event_queue = EventQueue(app=self)
+        self.supervisor = ShardSupervisor(event_queue=self.event_queue)
+        self.metrics_collector = MetricsCollector(event_queue=self.event_queue, on_snapshot=self.on_metrics_snapshot)
+        self.launch_planner = LaunchPlanner(app=self)
+        self.boot_history = BootHistory()
+
     def create_widgets(self):
         """
         Top section:
@@ -332,6 +344,8 @@ class App(CTk):
 
         if self.master_shard.is_running():
             self.master_shard.stop()
+        elif self.master_shard.is_attached():
+            self.stop_shards() # Detaches.
         else:
             self.shard_group.start_all_shards()
 
@@ -378,6 +392,13 @@ class App(CTk):
     def stop_shards(self):
         self.shard_group.stop_all_shards()
 
+    def on_metrics_snapshot(self, snapshot):
+        for frame in self.shard_group.get_shards():
+            sample = snapshot.shards.get(frame.server)
+
+            if sample is not None:
+                frame.server.on_process_sample(sample)
+
     def restart_application(self, *args, **kwargs):
         """Restart the PyInstaller-exe or Python script safely."""
         logger.info("Restarting the application.")
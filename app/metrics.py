@@ -0,0 +1,188 @@
+import math, time
+from array import array
+
+# ------------------------------------------------------------------------------------ #
+
+class METRIC:
+    MEMORY  = "MEMORY"  # Resident memory, in MB.
+    CPU     = "CPU"     # Percent of a core.
+    PLAYERS = "PLAYERS"
+    LAG     = "LAG"     # Percent of sim time lost, see ShardTelemetry.sim_speed.
+
+METRICS = [METRIC.MEMORY, METRIC.CPU, METRIC.PLAYERS, METRIC.LAG]
+
+# Seconds per point of each resolution, finest first.
+RESOLUTIONS = (1, 60, 900)
+
+# Resolutions of the shard metrics. Their finest buckets hold about two samples,
+# so a bucket without any is a missing sample, not the time between two of them.
+METRIC_RESOLUTIONS = {
+    METRIC.MEMORY:  (5, 60, 900),  # Sampled every MetricsCollector.INTERVAL, 2.5 s.
+    METRIC.CPU:     (5, 60, 900),
+    METRIC.PLAYERS: (20, 60, 900), # Reported every TELEMETRY_INTERVAL, 10 s.
+    METRIC.LAG:     (20, 60, 900),
+}
+
+# Points kept per resolution: 4 hours at 1 min, 2.5 days at 15 min.
+POINTS = 240
+
+class RingBuffer():
+    """
+    Fixed-size buffer of floats in an array('d'). Once full, each new value overwrites the oldest one.
+
+    Args:
+        size (int): the number of values kept.
+    """
+
+    def __init__(self, size) -> None:
+        self.size = size
+
+        self._values = array("d", bytes(8 * size))
+        self._next = 0  # Where the next value goes.
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._values[self._next] = value
+
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def get_values(self):
+        """ Returns the values, oldest first, as an array('d'). """
+
+        if self._count < self.size:
+            return self._values[:self._count]
+
+        return self._values[self._next:] + self._values[:self._next]
+
+    def clear(self):
+        self._next = self._count = 0
+
+
+class _Resolution():
+    """ Points of a TimeSeries at one resolution, and the bucket being averaged. """
+
+    def __init__(self, seconds, points, hold) -> None:
+        self.seconds = seconds
+        self.points = RingBuffer(points)
+        self.hold = hold
+
+        self.clear()
+
+    def clear(self):
+        self.points.clear()
+
+        self.bucket = None # Number of the bucket being averaged, time // seconds.
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, value, now):
+        bucket = int(now // self.seconds)
+
+        if self.bucket is not None and bucket != self.bucket:
+            average = self.sum / self.count
+
+            self.points.append(average)
+
+            # Buckets without samples.
+            gap = average if self.hold else math.nan
+
+            for _ in range(min(bucket - self.bucket - 1, self.points.size)):
+                self.points.append(gap)
+
+            self.sum = 0.0
+            self.count = 0
+
+        self.bucket = bucket
+        self.sum += value
+        self.count += 1
+
+
+class TimeSeries():
+    """
+    Samples of a single value over time, averaged in buckets of each of RESOLUTIONS seconds, POINTS per resolution.
+    Memory is fixed at creation, whatever the uptime: the oldest points of each resolution are overwritten.
+
+    Args:
+        resolutions (tuple): seconds per point of each resolution, finest first.
+        points (int): points kept per resolution.
+        hold (bool): if True, buckets without samples keep the previous value, for values only sampled when they change.
+            Otherwise they're NaN.
+    """
+
+    def __init__(self, resolutions=RESOLUTIONS, points=POINTS, hold=False) -> None:
+        self.resolutions = [_Resolution(seconds, points, hold) for seconds in resolutions]
+
+        self.last = None
+
+    def add(self, value, now=None):
+        """
+        Args:
+            value (float): the sample.
+            now (float, None): time.perf_counter() value of when it was taken. Defaults to now.
+        """
+
+        now = now is None and time.perf_counter() or now
+
+        for resolution in self.resolutions:
+            resolution.add(value, now)
+
+        self.last = value
+
+    def get(self, seconds):
+        """
+        Args:
+            seconds (int): one of the resolutions.
+
+        Returns:
+            values (list): the points, oldest first, the last one being the average of the current bucket. NaN for buckets without samples.
+        """
+
+        for resolution in self.resolutions:
+            if resolution.seconds == seconds:
+                values = resolution.points.get_values().tolist()
+
+                if resolution.count:
+                    values.append(resolution.sum / resolution.count)
+
+                return values
+
+        raise ValueError(f"No {seconds} seconds resolution.")
+
+    def get_trend(self, min_points=30):
+        """ Returns the points of the coarsest resolution that has min_points, to show the longest trend with enough detail. """
+
+        for resolution in reversed(self.resolutions):
+            if len(resolution.points) >= min_points:
+                return self.get(resolution.seconds)
+
+        return self.get(self.resolutions[0].seconds)
+
+    def clear(self):
+        for resolution in self.resolutions:
+            resolution.clear()
+
+        self.last = None
+
+
+class ShardMetrics():
+    """ A TimeSeries per METRIC of a shard. """
+
+    def __init__(self) -> None:
+        self.series = { metric: TimeSeries(resolutions=METRIC_RESOLUTIONS[metric]) for metric in METRICS }
+
+    def add(self, metric, value, now=None):
+        self.series[metric].add(value, now)
+
+    def get_trend(self, metric):
+        return self.series[metric].get_trend()
+
+    def get_last(self, metric):
+        return self.series[metric].last
+
+    def clear(self):
+        for series in self.series.values():
+            series.clear()
@@ -0,0 +1,163 @@
+import os, time, logging, threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import psutil
+
+from constants import LOGGER
+from process_sampler import ProcessSampler
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass(frozen=True)
+class MetricsSnapshot():
+    """
+    Simple dataclass with the samples of one MetricsCollector pass. Never modified once published, any thread can read it.
+
+    Args:
+        time (float): time.perf_counter() value of when the pass ended.
+        launcher (ProcessSample, None): the launcher process, without its children.
+        shards (MappingProxyType): key -> ProcessSample, of the processes still running.
+    """
+    time: float = 0.0
+    launcher: object = None
+    shards: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+
+class MetricsCollector():
+    """
+    Background thread that samples every registered process, and the launcher itself, in a single pass every INTERVAL seconds.
+    Each pass publishes a new MetricsSnapshot: it replaces the snapshot attribute, and on_snapshot is called with it in the main loop.
+    psutil calls never run in the main loop, however slow they get. The thread only runs passes while processes are registered.
+
+    Args:
+        event_queue (EventQueue): used to call on_snapshot in the main loop.
+        on_snapshot (function): called in the main loop with each MetricsSnapshot.
+    """
+
+    INTERVAL = 2.5
+
+    def __init__(self, event_queue, on_snapshot) -> None:
+        self.event_queue = event_queue
+        self.on_snapshot = on_snapshot
+
+        self.snapshot = MetricsSnapshot()
+
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        self._processes = {} # key -> process or pid, main loop side.
+        self._producing = False # Registered as an event_queue producer, until the thread goes idle.
+
+        self._samplers = {} # key -> (process, ProcessSampler or None), collector thread side.
+        self._launcher_sampler = None
+
+    def add(self, key, process):
+        """
+        Samples process from the next pass on, until removed.
+
+        Args:
+            key (object): the key of its samples in MetricsSnapshot.shards, e.g. its DedicatedServerShard.
+            process (int, psutil.Process): the process, or its pid.
+        """
+
+        if not self._producing:
+            self._producing = True
+            self.event_queue.add_producer()
+
+        with self._lock:
+            self._processes[key] = process
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="MetricsCollector", daemon=True)
+                self._thread.start()
+
+        self._wake.set()
+
+    def remove(self, key):
+        with self._lock:
+            self._processes.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                processes = dict(self._processes)
+
+            if not processes:
+                self._samplers.clear()
+
+                self.event_queue.put(self._on_idle) # After the last snapshot.
+
+                self._wake.wait()
+                self._wake.clear()
+
+                continue
+
+            started = time.perf_counter()
+
+            try:
+                snapshot = self._collect(processes)
+
+            except Exception as e:
+                logger.error(f"MetricsCollector: {e}")
+
+            else:
+                self.snapshot = snapshot
+                self.event_queue.put(self.on_snapshot, snapshot)
+
+            self._wake.wait(max(0, self.INTERVAL - (time.perf_counter() - started)))
+            self._wake.clear()
+
+    def _on_idle(self):
+        with self._lock:
+            if self._processes or not self._producing:
+                return # Added meanwhile, the thread is running passes again.
+
+            self._producing = False
+
+        self.event_queue.remove_producer()
+
+    def _collect(self, processes):
+        for key in [key for key in self._samplers if key not in processes]:
+            del self._samplers[key]
+
+        shards = {}
+
+        for key, process in processes.items():
+            sampler = self._get_sampler(key, process)
+
+            if sampler is not None:
+                sample = sampler.sample()
+
+                if sample is not None:
+                    shards[key] = sample
+
+        if self._launcher_sampler is None:
+            self._launcher_sampler = ProcessSampler(os.getpid(), children=False) # Its children are the shards.
+
+        return MetricsSnapshot(
+            time = time.perf_counter(),
+            launcher = self._launcher_sampler.sample(),
+            shards = MappingProxyType(shards),
+        )
+
+    def _get_sampler(self, key, process):
+        current = self._samplers.get(key)
+
+        if current is not None and current[0] == process:
+            return current[1]
+
+        try:
+            sampler = ProcessSampler(process)
+
+        except psutil.Error as e:
+            logger.warning(f"MetricsCollector: can't sample process {process}: {e}")
+
+            sampler = None # Not retried, until the key gets another process.
+
+        self._samplers[key] = (process, sampler)
+
+        return sampler
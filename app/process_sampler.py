@@ -0,0 +1,163 @@
+import time, logging
+from dataclasses import dataclass
+
+import psutil
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass(frozen=True)
+class ProcessSample():
+    """
+    Simple dataclass with the resource usage of a process and its children, at one point in time.
+
+    Args:
+        time (float): time.perf_counter() value of when it was taken.
+        rss (int): resident memory, in bytes.
+        uss (int, None): memory that would be freed if the processes exited, in bytes, as of the last read, see ProcessSampler.USS_INTERVAL.
+            None if it can't be read.
+        memory_percent (float): rss, in percent of the system memory.
+        cpu_percent (float): percent of a single core, since the previous sample. Can be over 100 with several threads.
+        read_bytes (int, None): bytes read since the processes started. None if it can't be read.
+        write_bytes (int, None): bytes written since the processes started.
+        threads (int): number of threads.
+        children (int): number of child processes included.
+    """
+    time: float
+    rss: int
+    uss: int
+    memory_percent: float
+    cpu_percent: float
+    read_bytes: int
+    write_bytes: int
+    threads: int
+    children: int
+
+def _add(total, value):
+    """ Sum of metrics that may be unavailable: None stays None. """
+
+    return None if total is None or value is None else total + value
+
+
+class ProcessSampler():
+    """
+    Samples the resource usage of a process tree. The psutil.Process instances are kept between samples,
+    so CPU percentages are measured between two samples, and each sample reads every metric of a process in a single oneshot().
+
+    Args:
+        process (int, psutil.Process): the process, or its pid.
+        children (bool): if False, child processes aren't included.
+    """
+
+    USS_INTERVAL = 12 # Samples between USS reads: memory_full_info walks every memory page of the process.
+
+    def __init__(self, process, children=True) -> None:
+        self.process = isinstance(process, psutil.Process) and process or psutil.Process(process)
+        self.children = children
+
+        self._children = {} # pid -> psutil.Process, kept for their CPU percentages.
+        self._uss = {}      # pid -> last USS read, None if the process denies it: it's never read again.
+        self._count = 0
+
+        self.process.cpu_percent(None) # The first call only starts the measure.
+
+    def sample(self):
+        """
+        Returns:
+            sample (ProcessSample, None): the usage of the process and its children, None if the process is gone.
+        """
+
+        read_uss = self._count % self.USS_INTERVAL == 0
+        self._count += 1
+
+        try:
+            values = self._sample_process(self.process, read_uss)
+
+        except psutil.Error:
+            return None
+
+        children = self._get_children()
+
+        for child in children:
+            try:
+                child_values = self._sample_process(child, read_uss)
+
+            except psutil.Error:
+                continue # Exited meanwhile.
+
+            values = [_add(total, value) for total, value in zip(values, child_values)]
+
+        rss, uss, memory_percent, cpu_percent, read_bytes, write_bytes, threads = values
+
+        return ProcessSample(
+            time = time.perf_counter(),
+            rss = rss,
+            uss = uss,
+            memory_percent = memory_percent,
+            cpu_percent = cpu_percent,
+            read_bytes = read_bytes,
+            write_bytes = write_bytes,
+            threads = threads,
+            children = len(children),
+        )
+
+    def _get_children(self):
+        if not self.children:
+            return []
+
+        try:
+            current = { child.pid: child for child in self.process.children(recursive=True) }
+
+        except psutil.Error:
+            return []
+
+        for pid, child in current.items():
+            if pid not in self._children:
+                self._children[pid] = child
+                child.cpu_percent(None)
+
+        for pid in [pid for pid in self._children if pid not in current]:
+            del self._children[pid]
+            self._uss.pop(pid, None)
+
+        return list(self._children.values())
+
+    def _sample_process(self, process, read_uss):
+        """
+        Args:
+            process (psutil.Process): the process.
+            read_uss (bool): if True, the USS is read again. It's always read the first time a process is sampled.
+
+        Raises:
+            psutil.Error: if the process is gone.
+        """
+
+        with process.oneshot():
+            memory = process.memory_info()
+
+            if process.pid not in self._uss or (read_uss and self._uss[process.pid] is not None):
+                try:
+                    self._uss[process.pid] = process.memory_full_info().uss
+
+                except psutil.AccessDenied:
+                    self._uss[process.pid] = None # Needs more access rights than the other metrics.
+
+            try:
+                io = process.io_counters()
+                read_bytes, write_bytes = io.read_bytes, io.write_bytes
+
+            except (psutil.AccessDenied, AttributeError): # Not available on macOS.
+                read_bytes = write_bytes = None
+
+            return [
+                memory.rss,
+                self._uss[process.pid],
+                process.memory_percent(),
+                process.cpu_percent(None),
+                read_bytes,
+                write_bytes,
+                process.num_threads(),
+            ]
@@ -0,0 +1,251 @@
+import time, logging
+from dataclasses import dataclass
+from math import ceil
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class TaskStats():
+    """
+    Simple dataclass with the execution stats of a ScheduledTask.
+
+    Args:
+        name (str): the task name.
+        period (int): the task interval in milliseconds.
+        runs (int): number of executions.
+        total_time (float): total execution time in milliseconds.
+        max_time (float): longest execution time in milliseconds.
+        missed (int): executions that happened more than one tick after their deadline.
+    """
+    name: str
+    period: int
+    runs: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    missed: int = 0
+
+    @property
+    def average_time(self):
+        return self.runs and self.total_time / self.runs or 0
+
+
+class ScheduledTask():
+    """
+    A task registered in the Scheduler. Use Scheduler.add to create one.
+
+    Args:
+        scheduler (Scheduler): the owner.
+        func (function): the function to call. Must return the same values as a PeriodicTask function.
+        period (int, float): interval in milliseconds.
+        args (list): parameters to give to the function call.
+        name (str): used in stats.
+    """
+
+    def __init__(self, scheduler, func, period, args, name) -> None:
+        self.scheduler = scheduler
+        self.func = func
+        self.period = period
+        self.args = args
+
+        self.due_tick = None
+        self.alive = True
+
+        self.stats = TaskStats(name=name, period=period)
+
+    def kill(self):
+        """ Stops the task. """
+
+        self.scheduler.remove(self)
+
+
+class Scheduler():
+    """
+    Hashed timer wheel that drives every periodic task of the app from a single Tk "after" chain.
+    The chain only runs while there are tasks, and sleeps until the next slot that holds a due task.
+
+    Args:
+        app (CTk): window root widget.
+        tick (int): wheel resolution in milliseconds.
+        slots (int): number of wheel slots.
+    """
+
+    def __init__(self, app, tick=25, slots=256) -> None:
+        self.app = app
+        self.tick = tick
+
+        self._wheel = [[] for _ in range(slots)]
+        self._tasks = set()
+        self._current_tick = 0
+        self._start = time.perf_counter()
+        self._after_id = None
+
+    # ------------------------------------------------------------------------------ #
+
+    def add(self, func, period, *args, initial_time=None, name=None):
+        """
+        Registers a periodic task.
+
+        Args:
+            func (function): the function to call. It needs to return 2 values:
+                success (bool, None): if not True, the task is removed.
+                newtime: (int, float, None): override "period" for the next call, if not None.
+            period (int, float): interval in milliseconds.
+            args (list): additional parameters to give to the function call.
+            initial_time (int, float, None): override "period" in the first call. Optional.
+            name (str, None): used in stats. Defaults to the function name.
+
+        Returns:
+            task (ScheduledTask): the task handle.
+        """
+
+        name = name or getattr(func, "__qualname__", repr(func))
+
+        task = ScheduledTask(scheduler=self, func=func, period=period, args=args, name=name)
+
+        if self._after_id is None:
+            self._current_tick = self._now_tick() # Was idle.
+
+        self._tasks.add(task)
+        self._insert(task, initial_time if initial_time is not None else period)
+
+        self._wake()
+
+        return task
+
+    def remove(self, task):
+        if not task.alive:
+            return
+
+        task.alive = False
+        self._tasks.discard(task)
+
+        if task.due_tick is not None:
+            slot = self._wheel[task.due_tick % len(self._wheel)]
+
+            if task in slot:
+                slot.remove(task)
+
+        if not self._tasks and self._after_id is not None:
+            self.app.after_cancel(self._after_id)
+            self._after_id = None
+
+    def get_stats(self):
+        """
+        Returns:
+            stats (list): a TaskStats for each registered task, sorted by total execution time.
+        """
+
+        return sorted((task.stats for task in self._tasks), key=lambda stats: stats.total_time, reverse=True)
+
+    @property
+    def task_count(self):
+        return len(self._tasks)
+
+    @property
+    def missed_deadlines(self):
+        return sum(task.stats.missed for task in self._tasks)
+
+    # ------------------------------------------------------------------------------ #
+
+    def _now_tick(self):
+        return int((time.perf_counter() - self._start) * 1000 // self.tick)
+
+    def _insert(self, task, delay):
+        due = max(self._current_tick, self._now_tick()) + max(1, ceil(delay / self.tick))
+
+        task.due_tick = due
+
+        self._wheel[due % len(self._wheel)].append(task)
+
+    def _collect_due_tasks(self, now):
+        due_tasks = []
+
+        # After a long stall, visiting every slot once is enough.
+        for tick in range(self._current_tick + 1, min(now, self._current_tick + len(self._wheel)) + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+
+            if not slot:
+                continue
+
+            ready = [task for task in slot if task.due_tick <= now]
+
+            for task in ready:
+                slot.remove(task)
+
+            due_tasks.extend(ready)
+
+        return due_tasks
+
+    def _run(self):
+        self._after_id = None
+
+        now = self._now_tick()
+
+        due_tasks = self._collect_due_tasks(now)
+
+        self._current_tick = max(self._current_tick, now)
+
+        due_tasks.sort(key=lambda task: task.due_tick)
+
+        try:
+            for task in due_tasks:
+                if task.alive:
+                    self._execute(task, now)
+
+        finally:
+            self._wake() # Whatever happened, the remaining tasks keep running.
+
+    def _execute(self, task, now):
+        if now - task.due_tick > 1:
+            task.stats.missed += 1
+
+        task.due_tick = None
+
+        start = time.perf_counter()
+
+        try:
+            success, newtime = task.func(*task.args)
+
+        except Exception as e:
+            logger.error(f"Scheduler: {task.stats.name} failed: {e}", exc_info=True)
+
+            success, newtime = True, None # Rescheduled, a single failure shouldn't stop it for good.
+
+        elapsed = (time.perf_counter() - start) * 1000
+
+        task.stats.runs += 1
+        task.stats.total_time += elapsed
+        task.stats.max_time = max(task.stats.max_time, elapsed)
+
+        if not task.alive:
+            return # Killed by its own function.
+
+        if success:
+            self._insert(task, newtime or task.period)
+        else:
+            self.remove(task)
+
+    def _next_due_tick(self):
+        for tick in range(self._current_tick + 1, self._current_tick + len(self._wheel) + 1):
+            for task in self._wheel[tick % len(self._wheel)]:
+                if task.due_tick == tick:
+                    return tick
+
+        # Nothing due in this rotation.
+        return self._current_tick + len(self._wheel)
+
+    def _wake(self):
+        if not self._tasks:
+            return
+
+        if self._after_id is not None:
+            self.app.after_cancel(self._after_id)
+
+        due_ms = self._next_due_tick() * self.tick
+        now_ms = (time.perf_counter() - self._start) * 1000
+
+        self._after_id = self.app.after(max(1, round(due_ms - now_ms)), self._run)
@@ -11,10 +11,12 @@ class Settings:
 
     LANGUAGE = "LANGUAGE"
     LAUNCH_OPTIONS = "LAUNCH_OPTIONS"
+    LAUNCH_STRATEGY = "LAUNCH_STRATEGY"
 
     DEFAULTS = {
         LANGUAGE: get_default_language_code(),
         LAUNCH_OPTIONS: "",
+        LAUNCH_STRATEGY: "PARALLEL",
     }
 
 class SettingsManager:
@@ -0,0 +1,127 @@
+import logging
+from pathlib import Path
+from datetime import datetime
+
+from constants import LOGGER
+from helpers import resource_path
+from log_store import LineStore, LogFileStore, SegmentStore, SEGMENT_WRITER, prune_segments
+from log_index import LogIndex
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class ShardLog():
+    """
+    Output of a shard: the store with every line of the session, and their search index.
+    Lives as long as the shard, whether its log panel was ever opened or not. A ShardLogPanel shows it while attached to the shard.
+
+    Args:
+        server (DedicatedServerShard): the shard.
+    """
+
+    SESSION_COUNT = 10 # Output segments kept on disk per shard.
+
+    def __init__(self, server) -> None:
+        self.server = server
+        self.shard = server.shard
+
+        # Live output goes to a SegmentStore on disk, server_log.txt is read through a LogFileStore.
+        self.store = LineStore()
+
+        # Index of the store lines, for searches. Log files on disk are indexed by SEARCH_WORKER.
+        self.index = LogIndex()
+
+        self.panel = None # The ShardLogPanel showing this log, if any.
+
+    def append(self, lines):
+        """
+        Args:
+            lines (list): complete output lines, str or bytes.
+        """
+
+        continued = self.store.partial
+
+        # Dropped lines aren't indexed either, the index follows the store line numbers.
+        if self.store.append(lines):
+            self.index.add(lines, continued, self.store.get_raw)
+
+        if self.panel is not None:
+            self.panel.on_lines_appended()
+
+    def set_store(self, store):
+        """
+        Replaces the store. The previous one is closed.
+
+        Args:
+            store (LineStore, SegmentStore, LogFileStore): the new store.
+        """
+
+        self.store.close()
+
+        self.store = store
+        self.index.clear()
+
+        if self.panel is not None:
+            self.panel.on_store_changed()
+
+    def start_session(self):
+        """ Starts a new segment file for the shard output, the previous ones stay on disk. """
+
+        if isinstance(self.store, SegmentStore) and not len(self.store):
+            return # Already a new session.
+
+        directory = self.get_sessions_directory()
+
+        self.set_store(SegmentStore(directory / f"{datetime.now():%Y%m%d-%H%M%S-%f}.log"))
+
+        # The new segment is only created by its first write.
+        SEGMENT_WRITER.put(prune_segments, directory, self.SESSION_COUNT - 1)
+
+    def load_log_file(self, count):
+        """
+        Replaces the store with the shard server_log.txt, starting from its last lines.
+
+        Args:
+            count (int): number of lines to load from the end.
+        """
+
+        store = LogFileStore(self.get_log_file_path())
+        store.load_older(count)
+
+        self.set_store(store)
+
+        logger.debug(f"Loaded log file for {self.shard}.")
+
+    def reset(self):
+        self.set_store(LineStore())
+
+    def close(self):
+        self.store.close()
+
+    def get_log_file_path(self):
+        return Path(self.server.app.cluster_entry.get()) / self.shard / "server_log.txt"
+
+    def get_sessions_directory(self):
+        return resource_path("savedata/sessions") / Path(self.server.app.cluster_entry.get()).name / self.shard
+
+    def get_history_paths(self):
+        """
+        Returns:
+            paths (list): log files with this shard's output that aren't in its store: the session segments, newest first,
+                and server_log.txt if the shard isn't running.
+        """
+
+        paths = []
+
+        if not (self.server.is_running() or self.server.is_attached()):
+            paths.append(self.get_log_file_path())
+
+        directory = self.get_sessions_directory()
+
+        if directory.exists():
+            live_path = isinstance(self.store, SegmentStore) and self.store.path
+
+            paths.extend(path for path in sorted(directory.glob("*.log"), reverse=True) if path != live_path)
+
+        return paths
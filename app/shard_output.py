@@ -0,0 +1,230 @@
+import logging, re
+from dataclasses import dataclass
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class OUTPUT_EVENT:
+    SHUTDOWN     = "SHUTDOWN"
+    TOKEN_ERROR  = "TOKEN_ERROR"
+    ROLLBACK     = "ROLLBACK"
+    ONLINE       = "ONLINE"
+    PORT_IN_USE  = "PORT_IN_USE"
+    START_FAILED = "START_FAILED"
+    SIM_PAUSED   = "SIM_PAUSED"
+    LUA_ERROR    = "LUA_ERROR"
+    VOX_DATA     = "VOX_DATA"
+
+    # Boot phases.
+    MODS_LOADING    = "MODS_LOADING"
+    WORLD_LOADING   = "WORLD_LOADING"
+    SIM_STARTED     = "SIM_STARTED"
+    WORLD_CONNECTED = "WORLD_CONNECTED"
+
+# Boot phase markers, not worth looking for once their phase was reached.
+BOOT_OUTPUT_EVENTS = { OUTPUT_EVENT.MODS_LOADING, OUTPUT_EVENT.WORLD_LOADING, OUTPUT_EVENT.SIM_STARTED, OUTPUT_EVENT.WORLD_CONNECTED }
+
+# Event kinds looked for in the output an attached shard wrote before it was attached, to restore its status.
+HISTORY_OUTPUT_EVENTS = { OUTPUT_EVENT.ONLINE, OUTPUT_EVENT.ROLLBACK, OUTPUT_EVENT.VOX_DATA }
+
+# Event kinds still handled while the shard is stopping: its own shutdown is what stops the rest of the cluster.
+STOPPING_OUTPUT_EVENTS = { OUTPUT_EVENT.SHUTDOWN }
+
+# Markers don't start with "[": every timestamped line does, and it would make the regex engine try all of them on every line.
+_OUTPUT_EVENT_PATTERNS = {
+    OUTPUT_EVENT.SHUTDOWN:     re.escape("Shard] Stopping"),
+    OUTPUT_EVENT.TOKEN_ERROR:  r"E_(?:INVALID|EXPIRED)_TOKEN",
+    OUTPUT_EVENT.ROLLBACK:     re.escape("Received world rollback request"),
+    OUTPUT_EVENT.ONLINE:       re.escape("uploads added to server."),
+    OUTPUT_EVENT.PORT_IN_USE:  re.escape("SOCKET_PORT_ALREADY_IN_USE"),
+    OUTPUT_EVENT.START_FAILED: re.escape("Error] Server failed to start!"),
+    OUTPUT_EVENT.SIM_PAUSED:   re.escape("Sim paused"),
+    OUTPUT_EVENT.LUA_ERROR:    re.escape("LUA ERROR stack traceback"),
+    OUTPUT_EVENT.VOX_DATA:     r"VoxLauncherData=(?P<payload>{.+})",
+
+    OUTPUT_EVENT.MODS_LOADING:    re.escape("Loading mod: "),
+    OUTPUT_EVENT.WORLD_LOADING:   re.escape("Reconstructing topology"),
+    OUTPUT_EVENT.SIM_STARTED:     re.escape("Begin Session: "),
+    OUTPUT_EVENT.WORLD_CONNECTED: r"World \d+ is now connected",
+}
+
+# A substring every match of each pattern contains. Plain "in" checks are several times faster than any regex scan,
+# and most batches contain no marker at all.
+_OUTPUT_EVENT_LITERALS = {
+    OUTPUT_EVENT.SHUTDOWN:     "Shard] Stopping",
+    OUTPUT_EVENT.TOKEN_ERROR:  "_TOKEN",
+    OUTPUT_EVENT.ROLLBACK:     "Received world rollback request",
+    OUTPUT_EVENT.ONLINE:       "uploads added to server.",
+    OUTPUT_EVENT.PORT_IN_USE:  "SOCKET_PORT_ALREADY_IN_USE",
+    OUTPUT_EVENT.START_FAILED: "Error] Server failed to start!",
+    OUTPUT_EVENT.SIM_PAUSED:   "Sim paused",
+    OUTPUT_EVENT.LUA_ERROR:    "LUA ERROR stack traceback",
+    OUTPUT_EVENT.VOX_DATA:     "VoxLauncherData=",
+
+    OUTPUT_EVENT.MODS_LOADING:    "Loading mod: ",
+    OUTPUT_EVENT.WORLD_LOADING:   "Reconstructing topology",
+    OUTPUT_EVENT.SIM_STARTED:     "Begin Session: ",
+    OUTPUT_EVENT.WORLD_CONNECTED: " is now connected",
+}
+
+@dataclass
+class OutputEvent():
+    """
+    Simple dataclass describing something that happened in a shard output.
+
+    Args:
+        kind (str): one of OUTPUT_EVENT.
+        text (str): the matched text.
+        payload (str, None): the event data, if the event carries any.
+    """
+    kind: str
+    text: str
+    payload: str = None
+
+def decode_output(data):
+    """
+    Decodes raw shard output. Invalid bytes are replaced, never dropped along with their neighbours.
+
+    Args:
+        data (bytes, str): raw output, e.g. lines read back from a store, or already decoded text.
+
+    Returns:
+        text (str): the decoded text.
+    """
+
+    if isinstance(data, str):
+        return data
+
+    return data.decode("utf-8", errors="replace")
+
+class OutputEventParser():
+    """
+    Finds every key phase marker in shard output, in order.
+    Each marker has a literal substring, found with str.find, which is several times faster than any regex scan:
+    most batches contain no marker at all, and are never scanned by a regex. The pattern only runs on the lines where its literal is.
+    Raw bytes are scanned as they are, only the matched text is decoded.
+
+    Args:
+        patterns (dict): kind -> regex pattern.
+        literals (dict): kind -> substring every match of its pattern contains.
+    """
+
+    def __init__(self, patterns=_OUTPUT_EVENT_PATTERNS, literals=_OUTPUT_EVENT_LITERALS) -> None:
+        self.markers = [(kind, literals[kind], re.compile(pattern)) for kind, pattern in patterns.items()]
+        self.bytes_markers = [(kind, literals[kind].encode("utf-8"), re.compile(pattern.encode("utf-8"))) for kind, pattern in patterns.items()]
+
+    def parse(self, data, kinds=None):
+        """
+        Args:
+            data (str, bytes): complete output lines.
+            kinds (set, None): the event kinds to look for. Defaults to every kind.
+
+        Returns:
+            events (list): OutputEvent instances, in the order they appear in data.
+        """
+
+        found = []
+
+        raw = isinstance(data, bytes)
+        newline = raw and b"\n" or "\n"
+
+        for order, (kind, literal, pattern) in enumerate(raw and self.bytes_markers or self.markers):
+            if kinds is not None and kind not in kinds:
+                continue
+
+            position = data.find(literal)
+
+            while position != -1:
+                line_start = data.rfind(newline, 0, position) + 1
+                line_end = data.find(newline, position)
+                line_end = line_end == -1 and len(data) or line_end
+
+                match = pattern.search(data, line_start, line_end)
+
+                if match:
+                    found.append((match.start(), order, kind, match))
+
+                    position = data.find(literal, max(position + 1, match.end()))
+                else:
+                    position = data.find(literal, line_end)
+
+        found.sort(key=lambda item: item[:2])
+
+        events = []
+
+        for _, _, kind, match in found:
+            payload = match.groupdict().get("payload")
+
+            events.append(OutputEvent(kind=kind, text=decode_output(match.group()), payload=payload is not None and decode_output(payload) or None))
+
+        return events
+
+OUTPUT_PARSER = OutputEventParser()
+
+# ------------------------------------------------------------------------------------ #
+
+class LineAssembler():
+    """
+    Turns arbitrary output chunks into complete lines.
+    A partial line at the end of a chunk is carried over and completed by the next chunk, so every line is handed downstream exactly once.
+
+    A carried partial line longer than max_line_length is emitted as is, without line ending, to keep memory bounded:
+    the first line of the next feed continues it. The stores join them back, see LineStore.partial.
+
+    Args:
+        max_line_length (int): the longest partial line carried.
+        raw (bool): if True, chunks and lines are bytes instead of str.
+    """
+
+    def __init__(self, max_line_length=1024 * 1024, raw=False) -> None:
+        self.max_line_length = max_line_length
+
+        self._newline = raw and b"\n" or "\n"
+        self._carry = self._newline[:0]
+
+    def feed(self, data):
+        """
+        Args:
+            data (str, bytes): the new chunk.
+
+        Returns:
+            lines (list): the completed lines, with their line endings. The last one has none if it's a piece of an overlong line.
+        """
+
+        if not data:
+            return []
+
+        if self._carry:
+            data = self._carry + data
+
+        lines = data.split(self._newline)
+
+        self._carry = lines.pop()
+
+        lines = [line + self._newline for line in lines]
+
+        if len(self._carry) > self.max_line_length:
+            logger.warning(f"LineAssembler: line longer than {self.max_line_length} characters, handing it in pieces.")
+
+            lines.append(self._carry)
+            self._carry = self._carry[:0]
+
+        return lines
+
+    def flush(self):
+        """
+        Returns the carried partial line, if any. Used when the stream has ended.
+
+        Returns:
+            lines (list): a list with the partial line, or an empty list.
+        """
+
+        carry, self._carry = self._carry, self._carry[:0]
+
+        return carry and [carry] or []
+
+    def reset(self):
+        self._carry = self._carry[:0]
@@ -1,149 +1,231 @@
 import logging
 
-import sys, os, psutil
-import random
 import logging, logging.config
+import psutil
 
 from pathlib import Path
-from io import TextIOWrapper
-
-from pexpect import popen_spawn
-from pexpect.exceptions import TIMEOUT, EOF
 
 from constants import *
 from helpers import *
 from strings import STRINGS
-from settings_manager import Settings
+from shard_output import OUTPUT_EVENT, OUTPUT_PARSER, BOOT_OUTPUT_EVENTS, HISTORY_OUTPUT_EVENTS, STOPPING_OUTPUT_EVENTS
+from boot_timeline import BOOT_PHASE, BootTimeline
+from log_follower import LogFollower
+from shard_log import ShardLog
+from shard_telemetry import ShardTelemetry
+from metrics import METRIC, ShardMetrics
 
 # ------------------------------------------------------------------------------------ #
 
 logger = logging.getLogger(LOGGER)
 
-PROCESS_ID = os.getpid()
-
-# ------------------------------------------------------------------------------------ #
-
-class StdoutMock(TextIOWrapper):
-    def __init__(self) -> None:
-        self.stdout = sys.stdout
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args, **kwargs):
-        sys.stdout = self.stdout
-
-    def write(self, *args, **kwargs):
-        pass
+class DedicatedServerShard():
+    # Ingest output as raw bytes: markers are scanned without decoding, and only displayed lines and events get decoded.
+    # About 15-25% faster from pipe reads to the store than decoding every read, see tools/benchmark_output_parser.py.
+    RAW_OUTPUT = True
 
+    ATTACH_POLL_INTERVAL = 1000 # Milliseconds between server_log.txt polls of an attached shard.
+    ATTACH_CATCH_UP_INTERVAL = 50
 
-class DedicatedServerShard():
     def __init__(self, app, shard_frame) -> None:
         self.process = None
+        self.boot_timeline = None
         self.app = app
 
+        # Attach mode: shard started outside of Vox, followed through its server_log.txt.
+        self.external_process = None
+        self.follower = None
+        self.follow_task = None
+
         self.shard_frame = shard_frame
         self.shard = shard_frame.code
 
-    def is_running(self):
-        return self.process and self.process.proc.poll() is None or False
+        self.log = ShardLog(self)
 
-    def get_arguments(self, launch_data):
-        game_directory    = Path(self.app.game_entry.get()   )
-        cluster_directory = Path(self.app.cluster_entry.get())
+        self.vox_data = {} # Merged VOX_DATA payloads of the output batch being handled.
+        self.telemetry = None # Last ShardTelemetry reported.
+        self.metrics = ShardMetrics() # Of the current launch.
+
+        self.process_sample = None # Last ProcessSample of the shard process, see MetricsCollector.
 
-        token = self.app.token_entry.get()
-        cluster = get_cluster_name(cluster_directory)
+        self.output_event_handlers = {
+            OUTPUT_EVENT.SHUTDOWN:     self.on_shutdown_event,
+            OUTPUT_EVENT.TOKEN_ERROR:  self.on_token_error_event,
+            OUTPUT_EVENT.ROLLBACK:     self.on_rollback_event,
+            OUTPUT_EVENT.ONLINE:       self.on_online_event,
+            OUTPUT_EVENT.PORT_IN_USE:  self.on_port_in_use_event,
+            OUTPUT_EVENT.START_FAILED: self.on_start_failed_event,
+            OUTPUT_EVENT.SIM_PAUSED:   self.on_sim_paused_event,
+            OUTPUT_EVENT.LUA_ERROR:    self.on_lua_error_event,
+            OUTPUT_EVENT.VOX_DATA:     self.on_vox_data_event,
 
-        cwd = (game_directory / "bin64").resolve()
-        exe = (cwd / "dontstarve_dedicated_server_nullrenderer_x64").resolve()
+            OUTPUT_EVENT.MODS_LOADING:    self.on_boot_phase_event,
+            OUTPUT_EVENT.WORLD_LOADING:   self.on_boot_phase_event,
+            OUTPUT_EVENT.SIM_STARTED:     self.on_boot_phase_event,
+            OUTPUT_EVENT.WORLD_CONNECTED: self.on_boot_phase_event,
+        }
+
+    def is_running(self):
+        return self.process is not None and self.process.is_running()
 
-        if not exe.with_suffix(".exe").exists():
-            # Dev build executable.
-            exe = (cwd / "dontstarve_dedicated_server_r_x64").resolve()
+    def is_attached(self):
+        return self.follower is not None
 
-        args = f"""
-            {exe}
-            -cluster {cluster}
-            -shard {self.shard}
-            -monitor_parent_process {PROCESS_ID}
-            -token {token}
+    def start(self, args, cwd):
         """
+        Spawns the shard process. Launch data and arguments are resolved by the LaunchPlanner.
+
+        Args:
+            args (list): the command line.
+            cwd (str): the working directory.
+        """
+
+        if self.is_running():
+            logger.warning(f"Shard {self.shard} is already running...")
+            return
 
-        args = args.split()
+        logger.info(f"Starting {self.shard} shard...")
 
-        if launch_data.ownerdir:
-            args.append("-ownerdir")
-            args.append(launch_data.ownerdir)
-        else:
-            logger.warning("Starting shard: missing user dir.")
+        self.boot_timeline = BootTimeline(self.shard)
+        self.shard_frame.update_boot_timeline(self.boot_timeline)
 
-        if launch_data.persistent_storage_root:
-            args.append("-persistent_storage_root")
-            args.append(launch_data.persistent_storage_root)
-        else:
-            logger.warning("Starting shard: missing storage root.")
+        self.clear_metrics()
 
-        if launch_data.ugc_directory:
-            args.append("-ugc_directory")
-            args.append(launch_data.ugc_directory)
-        else:
-            logger.warning("Starting shard: missing mods directory.")
+        self.shard_frame.set_starting()
 
-        extra_args = self.app.settings.get(Settings.LAUNCH_OPTIONS).split()
+        #logger.debug("Starting server with these arguments: %s", " ".join(args))
 
-        args = args + extra_args
+        self.process = self.app.supervisor.spawn(
+            args,
+            cwd,
+            on_output=self.handle_output,
+            on_exit=self.on_process_exit,
+            on_spawn=self.on_process_spawn,
+            raw=self.RAW_OUTPUT,
+        )
 
-        return args, str(cwd)
+    def on_process_spawn(self, process):
+        """
+        Called by the supervisor, in the main loop, once the process is created.
 
-    def start(self):
-        if self.is_running():
-            logger.warning(f"Shard {self.shard} is already running...")
-            return
+        Args:
+            process (ShardProcess): the process that was created.
+        """
 
-        game_directory_valid    = self.app.game_entry.validate_text()
-        cluster_directory_valid = self.app.cluster_entry.validate_text()
+        if process is not self.process:
+            return # Stopped meanwhile.
 
-        if not game_directory_valid or not cluster_directory_valid:
-            if self.shard_frame.is_master:
-                invalid_name = not game_directory_valid and STRINGS.ENTRY.GAME_TITLE or STRINGS.ENTRY.CLUSTER_TITLE
-                self.app.error_popup.create(STRINGS.ERROR.DIRECTORY_INVALID.format(directory_name=invalid_name))
-            return
+        self.mark_boot_phase(BOOT_PHASE.SPAWN)
 
-        launch_data = self.app.launch_data_save_loader.load()
+        self.start_sampling(process.pid)
 
-        if launch_data is None:
-            if self.shard_frame.is_master:
-                launch_data = retrieve_launch_data(self.app.cluster_entry.get(), self.app.launch_data_save_loader)
+    def attach(self, process):
+        """
+        Follows a shard process started outside of Vox: its server_log.txt goes through the same output handling as the launcher processes.
+        Commands can't be sent to it, and stopping it only detaches.
 
-                if launch_data is None:
-                    self.app.launch_data_popup.create(STRINGS.ERROR.LAUNCH_DATA_INVALID)
+        Args:
+            process (psutil.Process): the dedicated server process.
+        """
 
-                    return
-            else:
-                return
+        if self.is_running() or self.is_attached():
+            return
 
-        logger.info(f"Starting {self.shard} shard...")
+        logger.info(f"Attaching to {self.shard} shard, started outside of Vox (PID {process.pid}).")
+
+        self.external_process = process
+        self.clear_metrics()
+
+        # Its launch wasn't timed, boot phases from the followed log would be measured from an older launch.
+        self.boot_timeline = None
+        self.shard_frame.update_boot_timeline(None)
 
         self.shard_frame.set_starting()
 
-        args, cwd = self.get_arguments(launch_data)
+        self.follower = LogFollower(
+            path = Path(self.app.cluster_entry.get()) / self.shard / "server_log.txt",
+            on_lines = self.handle_output,
+            on_reset = self.on_log_file_reset,
+            on_history = self.handle_history_output,
+        )
 
-        #logger.debug("Starting server with these arguments: %s", " ".join(args))
+        self.follow_task = PeriodicTask(self.app, time=self.ATTACH_POLL_INTERVAL, func=self.poll_log_file, initial_time=0)
 
-        # This is HORRIBLE, but it works (Pyinstaller --noconcole + subprocess issue)
-        try:
-            with StdoutMock() as sys.stdout:
-                self.process = popen_spawn.PopenSpawn(args, cwd=cwd, encoding="utf-8", codec_errors="ignore")
-        except OSError as e:
-            logger.error(f"Failed to start {self.shard} shard: {e}")
+        self.start_sampling(process)
 
-            self.shard_frame.set_offline()
-            self.app.error_popup.create(STRINGS.ERROR.START_FAILED.format(shard=self.shard))
+    def start_sampling(self, process):
+        """
+        Args:
+            process (int, psutil.Process): the shard process, or its pid.
+        """
+
+        self.app.metrics_collector.add(self, process)
+
+    def stop_sampling(self):
+        self.app.metrics_collector.remove(self)
+
+        self.process_sample = None
+
+    def on_process_sample(self, sample):
+        """
+        Called in the main loop with each sample of the shard process taken by the MetricsCollector.
 
+        Args:
+            sample (ProcessSample): the sample.
+        """
+
+        self.process_sample = sample
+
+        self.metrics.add(METRIC.MEMORY, sample.rss / 1000 / 1000, now=sample.time)
+        self.metrics.add(METRIC.CPU, sample.cpu_percent, now=sample.time)
+
+        self.shard_frame.on_process_sampled()
+
+    def clear_metrics(self):
+        self.metrics.clear()
+
+        if self.shard_frame.is_master:
+            self.app.cluster_stats.clear_history()
+
+    def detach(self):
+        if not self.is_attached():
             return
 
-        self.task = PeriodicTask(self.app, random.randrange(50, 70), self.handle_output, initial_time=0)
+        logger.info(f"Detaching from {self.shard} shard.")
+
+        self.follow_task.kill()
+
+        self.follower = self.follow_task = self.external_process = None
+
+        self.on_stopped()
+
+    def poll_log_file(self):
+        if not self.is_attached():
+            return False, None
+
+        try:
+            running = self.external_process.is_running() and self.external_process.status() != psutil.STATUS_ZOMBIE
+
+        except psutil.Error:
+            running = False
+
+        if not running:
+            self.follower.flush()
+
+            if self.is_attached(): # Output events may have stopped the shards already.
+                self.detach()
+                self.app.stop_shards()
+
+            return False, None
+
+        pending = self.follower.poll()
+
+        return True, pending and self.ATTACH_CATCH_UP_INTERVAL or None
+
+    def on_log_file_reset(self):
+        logger.info(f"{self.shard} shard log file was replaced, the attached shard restarted.")
+
+        self.shard_frame.set_starting()
 
     def execute_command(self, command, log=True):
         if not self.is_running():
@@ -153,7 +235,7 @@ class DedicatedServerShard():
             logger.info(f"({self.shard}) Executing console command: {command}")
 
         try:
-            self.process.sendline(command)
+            self.process.write_line(command)
 
         except OSError as e:
             logger.error(f"OSError during DedicatedServerShard [{self.shard}] execute_command function! Command: '{command}'. Actual error: '{e}'")
@@ -163,25 +245,46 @@ class DedicatedServerShard():
     def on_stopped(self):
         logger.info(f"{self.shard} shard is down...")
 
-        if self.task:
-            self.task.kill()
+        self.stop_sampling()
 
         self.shard_frame.set_offline()
 
+        if self.boot_timeline is not None:
+            self.app.boot_history.add(self.boot_timeline) # Didn't get online, still worth keeping.
+
         self.process = None
-        self.task = None
+
+    def mark_boot_phase(self, phase, when=None):
+        """
+        Records a boot phase in the current BootTimeline and notifies the LaunchPlanner.
+
+        Args:
+            phase (str): one of BOOT_PHASES.
+            when (float, None): time.perf_counter() value of when the phase was reached. Defaults to now.
+        """
+
+        timeline = self.boot_timeline
+
+        if timeline is None or not timeline.mark(phase, when):
+            return
+
+        self.shard_frame.update_boot_timeline(timeline)
+
+        if timeline.complete:
+            self.app.boot_history.add(timeline)
+
+        self.app.launch_planner.on_boot_phase(self.shard_frame, phase)
 
     def stop(self):
+        if self.is_attached():
+            self.detach() # Not ours to stop.
+            return
+
         if not self.is_running():
             return
 
         if self.shard_frame.is_starting() or self.shard_frame.is_restarting():
-            try:
-                if psutil.pid_exists(self.process.pid):
-                    psutil.Process(self.process.pid).terminate()
-
-            except psutil.NoSuchProcess:
-                logger.warning(f"NoSuchProcess exception while stopping {self.shard} shard.")
+            self.process.terminate()
 
             self.on_stopped()
             self.app.stop_shards()
@@ -194,100 +297,211 @@ class DedicatedServerShard():
 
             logger.info(f"Stopping {self.shard} shard...")
 
-    def handle_output(self):
+    def on_process_exit(self, process):
         """
-        Reads all new data from shard.process and handle key phases.
-        Should be used in a PeriodicTask.
+        Called by the supervisor, in the main loop, once the process has exited and its output was fully read.
 
-        Returns:
-            success (bool, None): if not True, stops the loop. See PeriodicTask._execute.
-            newtime: (int, float, None): override PeriodicTask.time for the next call, if not None. See PeriodicTask._execute.
+        Args:
+            process (ShardProcess): the process that exited.
         """
 
-        if not self.is_running():
+        if process is not self.process:
+            return # Already handled, e.g. terminated by stop().
+
+        if process.error is not None:
+            logger.error(f"Failed to start {self.shard} shard: {process.error}")
+
             self.on_stopped()
-            self.app.stop_shards()
+            self.app.error_popup.create(STRINGS.ERROR.START_FAILED.format(shard=self.shard))
 
-            return False, None
+            return
 
-        text = None
+        self.on_stopped()
+        self.app.stop_shards()
 
-        try:
-            text = self.process.read_nonblocking(size=9999, timeout=None)
+    def handle_output(self, lines):
+        """
+        Handles new output from shard.process and its key phases.
+        Called by the supervisor, in the main loop.
 
-        except (EOF, TIMEOUT):
-            return True, 500
+        Args:
+            lines (list): new complete lines, bytes if RAW_OUTPUT. Each line is delivered only once.
+        """
 
-        if not text:
-            return True, None
+        if self.process is not None and self.process.first_output_time is not None:
+            self.mark_boot_phase(BOOT_PHASE.FIRST_OUTPUT, when=self.process.first_output_time)
 
-        self.shard_frame.add_text_to_log_screen(text)
+        self.log.append(lines)
 
-        self.handle_output_keywords(text=text)
+        self.handle_output_events(data=lines[0][:0].join(lines))
 
-        if self.shard_frame.is_master:
-            vox_data = read_vox_data(self.app.master_shard, text)
+    def handle_history_output(self, lines):
+        """
+        Handles the lines an attached shard wrote before it was attached. They are stored, but their events already happened:
+        nothing is dispatched, they only restore the shard status and the cluster stats.
 
-            if vox_data:
-                self.app.cluster_stats.update(vox_data)
+        Args:
+            lines (list): complete lines.
+        """
 
-        return True, None
+        self.log.append(lines)
 
-    def handle_output_keywords(self, text):
-        if "[Shard] Stopping" in text:
-            logger.info(f"{self.shard_frame.code} was shut down... Stopping other shards.")
+        online = None
+        vox_data = {}
 
-            self.shard_frame.set_stopping()
-            self.app.stop_shards()
+        for event in OUTPUT_PARSER.parse("".join(lines), HISTORY_OUTPUT_EVENTS):
+            if event.kind == OUTPUT_EVENT.VOX_DATA:
+                vox_data.update(read_vox_data(event.text) or {})
+            else:
+                online = event.kind == OUTPUT_EVENT.ONLINE # Until a later rollback.
 
-        elif "E_INVALID_TOKEN" in text or "E_EXPIRED_TOKEN" in text:
-            logger.error("Invalid Token: E_INVALID_TOKEN or E_EXPIRED_TOKEN")
+        if online and not self.shard_frame.is_online():
+            self.shard_frame.set_online()
 
-            self.app.token_entry.toggle_warning(False)
-            self.app.stop_shards()
+        elif online is False:
+            self.shard_frame.set_restarting()
 
-            self.app.error_popup.create(STRINGS.ERROR.TOKEN_INVALID)
+        vox_data.pop("telemetry", None) # Stale.
 
-        elif "Received world rollback request" in text:
-            logger.info(f"{self.shard} received a rollback request...")
+        if vox_data and self.shard_frame.is_master:
+            self.app.cluster_stats.update(vox_data)
 
-            self.app.shard_group.set_all_shards_restarting()
+    def handle_output_events(self, data):
+        """
+        Parses data into OutputEvents and dispatches them to self.output_event_handlers, in order.
+        Once the shard is stopping, only STOPPING_OUTPUT_EVENTS are, and none once it's offline.
 
-        elif "uploads added to server." in text:
-            logger.info(f"{self.shard} is now online!")
+        Args:
+            data (str, bytes): complete output lines.
+        """
 
-            self.shard_frame.set_online()
+        if self.shard_frame.is_offline():
+            return
 
-            self.app.token_entry.toggle_warning(True)
+        self.vox_data = {}
 
-        elif "SOCKET_PORT_ALREADY_IN_USE" in text:
-            logger.error("Invalid cluster path or ports in use: SOCKET_PORT_ALREADY_IN_USE.")
+        for event in OUTPUT_PARSER.parse(data, self.get_output_event_kinds()):
+            if self.shard_frame.is_offline():
+                break
 
-            self.app.stop_shards()
+            if self.shard_frame.is_stopping() and event.kind not in STOPPING_OUTPUT_EVENTS:
+                continue
+
+            self.output_event_handlers[event.kind](event)
+
+        # Merged from every payload of the batch, ClusterStats is updated once.
+        if self.vox_data:
+            self.app.cluster_stats.update(self.vox_data)
+
+    def get_output_event_kinds(self):
+        """
+        Returns:
+            kinds (set, None): the OUTPUT_EVENT kinds worth looking for in the output, None for every kind.
+                Boot phases already reached are skipped.
+        """
 
-            cluster_directory = Path(self.app.cluster_entry.get())
-            ports = []
+        if self.shard_frame.is_stopping():
+            return STOPPING_OUTPUT_EVENTS
 
-            for shard in get_shard_names(cluster_directory):
-                config_file = cluster_directory / shard / "server.ini"
+        if self.boot_timeline is None:
+            return None # Every kind.
 
-                if config_file.exists():
-                    port = get_key_from_ini_file(config_file, "server_port")
-                    ports.append(f"{port} ({STRINGS.SHARD_NAME[shard.upper()] or shard})")
+        return self.output_event_handlers.keys() - (BOOT_OUTPUT_EVENTS & self.boot_timeline.marks.keys())
 
-            self.app.error_popup.create(STRINGS.ERROR.PORTS.format(ports=", ".join(ports)))
+    def on_shutdown_event(self, event):
+        logger.info(f"{self.shard_frame.code} was shut down... Stopping other shards.")
 
-        elif "[Error] Server failed to start!" in text:
-            logger.error(f"{self.shard_frame.code} failed to start!")
+        self.shard_frame.set_stopping()
+        self.app.stop_shards()
 
-            self.app.stop_shards()
+    def on_token_error_event(self, event):
+        logger.error("Invalid Token: E_INVALID_TOKEN or E_EXPIRED_TOKEN")
+
+        self.app.token_entry.toggle_warning(False)
+        self.app.stop_shards()
+
+        self.app.error_popup.create(STRINGS.ERROR.TOKEN_INVALID)
+
+    def on_rollback_event(self, event):
+        logger.info(f"{self.shard} received a rollback request...")
+
+        self.app.shard_group.set_all_shards_restarting()
+
+    def on_online_event(self, event):
+        logger.info(f"{self.shard} is now online!")
+
+        self.shard_frame.set_online()
+
+        self.app.token_entry.toggle_warning(True)
+
+        self.mark_boot_phase(BOOT_PHASE.ONLINE)
+
+    def on_boot_phase_event(self, event):
+        self.mark_boot_phase(event.kind)
+
+    def on_port_in_use_event(self, event):
+        logger.error("Invalid cluster path or ports in use: SOCKET_PORT_ALREADY_IN_USE.")
+
+        self.app.stop_shards()
+
+        cluster_directory = Path(self.app.cluster_entry.get())
+        ports = []
+
+        for shard in get_shard_names(cluster_directory):
+            config_file = cluster_directory / shard / "server.ini"
+
+            if config_file.exists():
+                port = get_key_from_ini_file(config_file, "server_port")
+                ports.append(f"{port} ({STRINGS.SHARD_NAME[shard.upper()] or shard})")
 
-            self.app.error_popup.create(STRINGS.ERROR.GENERAL)
+        self.app.error_popup.create(STRINGS.ERROR.PORTS.format(ports=", ".join(ports)))
 
-        elif self.shard_frame.is_master and "Sim paused" in text:
+    def on_start_failed_event(self, event):
+        logger.error(f"{self.shard_frame.code} failed to start!")
+
+        self.app.stop_shards()
+
+        self.app.error_popup.create(STRINGS.ERROR.GENERAL)
+
+    def on_sim_paused_event(self, event):
+        if self.shard_frame.is_master:
             self.execute_command(load_lua_file("onserverpaused"), log=False)
 
-        elif "LUA ERROR stack traceback" in text:
-            logger.warning(f"{self.shard_frame.code} shard has crashed!")
+    def on_lua_error_event(self, event):
+        logger.warning(f"{self.shard_frame.code} shard has crashed!")
+
+        self.app.error_popup.create(STRINGS.ERROR.SERVER_CRASH)
+
+    def on_vox_data_event(self, event):
+        vox_data = read_vox_data(event.text)
+
+        if not vox_data:
+            return
+
+        # Sent by every shard, each payload is its own report.
+        telemetry = vox_data.pop("telemetry", None)
+
+        if telemetry is not None:
+            self.on_telemetry(ShardTelemetry.from_dict(telemetry))
+
+        if vox_data and self.shard_frame.is_master:
+            self.vox_data.update(vox_data)
+
+    def on_telemetry(self, telemetry):
+        """
+        Args:
+            telemetry (ShardTelemetry, None): the metrics reported, None if they were malformed.
+        """
+
+        if telemetry is None:
+            return
+
+        self.telemetry = telemetry
+
+        self.metrics.add(METRIC.PLAYERS, len(telemetry.pings), now=telemetry.time)
+        self.metrics.add(METRIC.LAG, max(0.0, 1 - telemetry.sim_speed) * 100, now=telemetry.time)
+
+        self.shard_frame.on_telemetry()
 
-            self.app.error_popup.create(STRINGS.ERROR.SERVER_CRASH)
\ No newline at end of file
+        if telemetry.sim_speed < 0.9 or telemetry.dropped_ticks:
+            logger.debug(f"{self.shard} shard is lagging: {telemetry.sim_speed:.0%} sim speed, {telemetry.dropped_ticks} dropped ticks.")
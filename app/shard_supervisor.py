@@ -0,0 +1,265 @@
+import asyncio, threading, subprocess, logging, codecs, os, time
+
+from constants import LOGGER
+from shard_output import LineAssembler
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class ShardProcess():
+    """
+    Main loop side handle of a shard process owned by ShardSupervisor.
+    Output is coalesced: the main loop is woken up once per batch of lines, not once per line.
+
+    The handle exists before the process does: lines written and terminate() calls made before it's created are applied once it is.
+    If it can't be created, error is set and on_exit is called.
+
+    Args:
+        supervisor (ShardSupervisor): the supervisor that owns the process.
+        on_output (function): called in the main loop with a list of new complete lines.
+        on_exit (function): called in the main loop with this handle, after the process has exited or failed to start.
+        on_spawn (function, None): called in the main loop with this handle, once the process is created and pid is set.
+        raw (bool): if True, lines are delivered as undecoded bytes.
+    """
+
+    def __init__(self, supervisor, on_output, on_exit, on_spawn=None, raw=False) -> None:
+        self.supervisor = supervisor
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.on_spawn = on_spawn
+        self.raw = raw
+
+        self.pid = None
+        self.returncode = None
+        self.error = None # Exception that prevented the process from starting.
+        self.first_output_time = None # time.perf_counter() value of the first read.
+
+        self._proc = None
+        self._task = None
+        self._exited = False
+        self._pending = []
+        self._lock = threading.Lock()
+
+        # Event loop side, requests made before the process was created.
+        self._early_writes = []
+        self._terminate_requested = False
+
+    def is_running(self):
+        """ True from spawn() until the process exits or fails to start. """
+
+        return not self._exited
+
+    def write_line(self, line):
+        """
+        Queues a line to be written to the process stdin, without blocking the main loop.
+
+        Args:
+            line (str): the line to write, without line ending.
+
+        Raises:
+            OSError: if the process is no longer accepting input.
+        """
+
+        proc = self._proc
+
+        if not self.is_running() or (proc is not None and proc.stdin.is_closing()):
+            raise OSError("stdin is closed")
+
+        self.supervisor.call_soon(self._write, (line + os.linesep).encode("utf-8"))
+
+    def terminate(self):
+        """ Asks the process to terminate. Exit is still reported through on_exit. """
+
+        if self.is_running():
+            self.supervisor.call_soon(self._terminate)
+
+    # Event loop side.
+
+    def _write(self, data):
+        if self._proc is None:
+            self._early_writes.append(data)
+            return
+
+        try:
+            self._proc.stdin.write(data)
+
+        except (OSError, RuntimeError) as e:
+            logger.error(f"Failed to write to process {self.pid} stdin: {e}")
+
+    def _terminate(self):
+        if self._proc is None:
+            self._terminate_requested = True
+            return
+
+        try:
+            self._proc.terminate()
+
+        except ProcessLookupError:
+            logger.warning(f"ProcessLookupError while terminating process {self.pid}.")
+
+    def _push_output(self, lines):
+        with self._lock:
+            queued = bool(self._pending)
+
+            self._pending.extend(lines)
+
+            if queued:
+                return # A flush is already queued.
+
+        self.supervisor.event_queue.put(self._flush_output)
+
+    def _set_spawned(self, proc):
+        self._proc = proc
+        self.pid = proc.pid
+
+        for data in self._early_writes:
+            self._write(data)
+
+        self._early_writes.clear()
+
+        if self._terminate_requested:
+            self._terminate()
+
+        if self.on_spawn is not None:
+            self.supervisor.event_queue.put(self.on_spawn, self)
+
+    def _set_exited(self, returncode, error=None):
+        self.returncode = returncode
+        self.error = error
+        self._exited = True
+
+        self.supervisor.event_queue.put(self._report_exit)
+
+    # Main loop side.
+
+    def _report_exit(self):
+        self.supervisor.event_queue.remove_producer() # Nothing is put for this process after this.
+
+        self.on_exit(self)
+
+    def _flush_output(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        if pending:
+            self.on_output(pending)
+
+
+class ShardSupervisor():
+    """
+    Owns every shard process through a single asyncio event loop running in a background thread.
+    The Tk layer only subscribes to its events, which are delivered through the app EventQueue.
+
+    Args:
+        event_queue (EventQueue): the app-wide event queue.
+    """
+
+    STREAM_LIMIT = 1024 * 1024
+    READ_SIZE = 65536
+
+    def __init__(self, event_queue) -> None:
+        self.event_queue = event_queue
+
+        self.loop = asyncio.new_event_loop()
+
+        self._thread = threading.Thread(target=self._run_loop, name="ShardSupervisor", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+
+        self.loop.run_forever()
+
+    def call_soon(self, func, *args):
+        """ Runs func(*args) in the supervisor event loop. Safe to call from any thread. """
+
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def spawn(self, args, cwd, on_output, on_exit, on_spawn=None, raw=False):
+        """
+        Starts a process and begins streaming its output. Never blocks: the process is created in the event loop,
+        and the outcome is reported through on_spawn, or on_exit with ShardProcess.error set.
+
+        Args:
+            args (list): the command line.
+            cwd (str): the working directory.
+            on_output (function): called in the main loop with a list of new complete lines.
+            on_exit (function): called in the main loop with the ShardProcess, after the process has exited or failed to start.
+            on_spawn (function, None): called in the main loop with the ShardProcess, once the process is created.
+            raw (bool): if True, lines are delivered as undecoded bytes, leaving decoding to the consumers that need text.
+
+        Returns:
+            process (ShardProcess): the process handle.
+        """
+
+        process = ShardProcess(self, on_output=on_output, on_exit=on_exit, on_spawn=on_spawn, raw=raw)
+
+        self.event_queue.add_producer() # Until on_exit.
+
+        asyncio.run_coroutine_threadsafe(self._spawn(process, args, cwd), self.loop)
+
+        return process
+
+    async def _spawn(self, process, args, cwd):
+        kwargs = {}
+
+        if os.name == "nt":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+            kwargs.update(startupinfo=startupinfo, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+
+        try:
+            # All three standard handles are pipes, which keeps PyInstaller --noconsole builds happy.
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=cwd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=self.STREAM_LIMIT,
+                **kwargs
+            )
+
+        except (OSError, ValueError) as e:
+            process._set_exited(None, error=e)
+            return
+
+        process._set_spawned(proc)
+
+        process._task = self.loop.create_task(self._pump(process))
+
+    async def _pump(self, process):
+        stdout = process._proc.stdout
+
+        # Reading whatever is available and framing it ourselves costs one wakeup per read instead of one per line.
+        assembler = LineAssembler(max_line_length=self.STREAM_LIMIT, raw=process.raw)
+
+        if process.raw:
+            decode = lambda data, final=False: data
+        else:
+            decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+
+        while True:
+            data = await stdout.read(self.READ_SIZE)
+
+            if not data:
+                break
+
+            if process.first_output_time is None:
+                process.first_output_time = time.perf_counter()
+
+            lines = assembler.feed(decode(data))
+
+            if lines:
+                process._push_output(lines)
+
+        lines = assembler.feed(decode(b"", final=True)) + assembler.flush()
+
+        if lines:
+            process._push_output(lines)
+
+        returncode = await process._proc.wait()
+
+        process._set_exited(returncode)
@@ -0,0 +1,85 @@
+import time, logging
+from dataclasses import dataclass, field
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+TELEMETRY_INTERVAL = 10 # Seconds between the telemetry payloads of each shard, see lua/telemetry.lua.
+
+@dataclass
+class ShardTelemetry():
+    """
+    Simple dataclass with the performance metrics a shard reports every TELEMETRY_INTERVAL.
+    Times are the ones elapsed since the previous report.
+
+    Args:
+        heap (float): Lua heap size, in KB.
+        entities (int): number of entities.
+        sim_time (float): seconds simulated.
+        wall_time (float): real seconds elapsed.
+        ticks (int): sim ticks run.
+        tick_time (float): seconds per tick, 1 / tick rate.
+        pings (dict): player name -> ping, in milliseconds.
+        save_duration (float, None): seconds the last save took, if the shard saved since the previous report.
+        time (float): time.perf_counter() value of when the report was received.
+    """
+    heap: float
+    entities: int
+    sim_time: float
+    wall_time: float
+    ticks: int
+    tick_time: float
+    pings: dict = field(default_factory=dict)
+    save_duration: float = None
+    time: float = field(default_factory=time.perf_counter)
+
+    @property
+    def sim_speed(self):
+        """ Sim seconds per real second. Below 1 the server is lagging. """
+
+        return self.wall_time > 0 and self.sim_time / self.wall_time or 1.0
+
+    @property
+    def dropped_ticks(self):
+        """ Ticks that should have run in wall_time, but didn't. """
+
+        if self.tick_time <= 0:
+            return 0
+
+        return max(0, round(self.wall_time / self.tick_time) - self.ticks)
+
+    @property
+    def max_ping(self):
+        return max(self.pings.values(), default=None)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data (dict): the "telemetry" field of a VoxLauncherData payload.
+
+        Returns:
+            telemetry (ShardTelemetry, None): the metrics, or None if data is malformed.
+        """
+
+        try:
+            # Empty Lua tables are encoded as JSON arrays.
+            pings = data.get("pings") or {}
+            save_duration = data.get("save")
+
+            return cls(
+                heap = float(data["heap"]),
+                entities = int(data["entities"]),
+                sim_time = float(data["sim_time"]),
+                wall_time = float(data["wall_time"]),
+                ticks = int(data["ticks"]),
+                tick_time = float(data["tick_time"]),
+                pings = {str(name): int(ping) for name, ping in dict(pings).items()},
+                save_duration = float(save_duration) if save_duration is not None else None,
+            )
+
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Invalid shard telemetry {data!r}: {e}")
@@ -2,7 +2,6 @@ import customtkinter as ctk
 from PIL import Image
 
 from constants import COLOR, Pos, Size
-from strings import STRINGS
 from fonts import FONT, LANGUAGE_FONT_FAMILY
 from widgets.buttons import CustomButton
 from helpers import resource_path
@@ -21,7 +20,7 @@ class CustomDropdown():
     def __init__(self, master, options, default, on_selected_option=None):
         self.master = master
         self.options = options
-        self.selected_value = ctk.StringVar(value=STRINGS.LANGUAGES[default])
+        self.selected_value = ctk.StringVar(value=dict(options).get(default, default))
         self.selected_code = default
         self.on_selected_option = on_selected_option
 
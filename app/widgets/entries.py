@@ -230,6 +230,8 @@ class ClusterDirectoryEntry(DirectoryEntry):
                     for shard in self._master.shard_group.shards.values():
                         shard.cleanup_state()
 
+                self._master.shard_group.attach_external_shards()
+
                 return
 
         self._master.shard_group.remove_all_shards()
@@ -1,24 +1,39 @@
-from customtkinter import CTkFrame, CTkLabel, CTkTextbox, CTkEntry, CTkButton, CTkSwitch, CTkScrollableFrame, CTkImage
+from customtkinter import CTkFrame, CTkLabel, CTkTextbox, CTkEntry, CTkButton, CTkSwitch, CTkScrollableFrame, CTkImage, CTkCanvas
 from tkinter import StringVar, END, CENTER, DISABLED, NORMAL, BOTH
-import re, logging
+import re, math, time, logging, collections, functools, threading
 from pathlib import Path
+from array import array
 from PIL import Image
 
 from strings import STRINGS, get_readable_system_language
 from constants import APP_VERSION, COLOR, SERVER_STATUS, OFFSET, SIZE, FRAME_GAP, FONT_SIZE, LOGGER, Pos, Size
 from widgets.buttons import RelativeXImageButton, CustomButton
-from helpers import load_lua_file, disable_bind, resource_path, get_memory_usage, open_folder, TextHighlightData, PeriodicTask, read_file_nonblocking
+from helpers import load_lua_file, disable_bind, resource_path, open_folder, find_external_shard_processes
+from log_store import LineStore, LogFileStore
+from boot_timeline import BOOT_PHASE
 from shard_server import DedicatedServerShard
+from shard_telemetry import TELEMETRY_INTERVAL
+from metrics import METRIC
+from log_highlighter import Highlighter, TextHighlightData, HIGHLIGHT_WORKER
+from log_index import SearchResult, SEARCH_WORKER
+from widgets.log_view import LogView
 from fonts import FONT
 
 logger = logging.getLogger(LOGGER)
 
 class LogsTopBar:
-    def __init__(self, master, server, shard) -> None:
+    folder_image = None # Shared by every top bar, decoded once.
+
+    def __init__(self, master) -> None:
         self.root = master
-        self.server = server
-        self.shard = shard
+        self.server = None
+        self.shard = None
+        self.shard_name = StringVar(value="--")
         self.memory = StringVar(value="--")
+        self.cpu = StringVar(value="--")
+        self.lag = StringVar(value="--")
+        self.store_stats = StringVar(value="--")
+        self.boot_timeline = StringVar(value="--")
 
         self._frame = CustomFrame(
             master=self.root,
@@ -29,7 +44,8 @@ class LogsTopBar:
 
         image_size = 17
 
-        image = CTkImage(Image.open(resource_path("assets/directory.png")), size=(image_size, image_size))
+        if LogsTopBar.folder_image is None:
+            LogsTopBar.folder_image = CTkImage(Image.open(resource_path("assets/directory.png")), size=(image_size, image_size))
 
         self.open_folder_button = CustomButton(
             master=self._frame,
@@ -38,14 +54,14 @@ class LogsTopBar:
             font=FONT.CLUSTER_STATS,
             size=Size(100, 20),
             pos=Pos(0, 0),
-            image=image,
+            image=LogsTopBar.folder_image,
         )
 
         self.open_folder_button.grid(
             row = 0,
-            column = 5,
+            column = 16,
             columnspan=3,
-            padx=(65, 0),
+            padx=(40, 0),
         )
 
         self.status_circle = ColouredCircle(
@@ -60,8 +76,27 @@ class LogsTopBar:
             padx=(15, 10),
         )
 
-        self.shard_name   = self.create_label(text=STRINGS.SHARD_NAME[self.shard.upper()] or self.shard, title=STRINGS.LOG_SCREEN.SHARD_NAME_TITLE, column=1)
+        self.shard_label  = self.create_label(textvariable=self.shard_name, title=STRINGS.LOG_SCREEN.SHARD_NAME_TITLE, column=1)
         self.memory_label = self.create_label(textvariable=self.memory, title=STRINGS.LOG_SCREEN.SHARD_MEMORY_TITLE, column=3)
+        self.cpu_label    = self.create_label(textvariable=self.cpu, title=STRINGS.LOG_SCREEN.SHARD_CPU_TITLE, column=6)
+        self.lag_label    = self.create_label(textvariable=self.lag, title=STRINGS.LOG_SCREEN.SHARD_LAG_TITLE, column=9)
+        self.lines_label  = self.create_label(textvariable=self.store_stats, title=STRINGS.LOG_SCREEN.SHARD_LINES_TITLE, column=12)
+        self.boot_label   = self.create_label(textvariable=self.boot_timeline, title=STRINGS.LOG_SCREEN.SHARD_BOOT_TITLE, column=14)
+
+        self.memory_sparkline = self.create_sparkline(color=COLOR.GREEN, column=5)
+        self.cpu_sparkline    = self.create_sparkline(color=COLOR.LIGHT_BLUE, column=8)
+        self.lag_sparkline    = self.create_sparkline(color=COLOR.YELLOW, column=11)
+
+    def create_sparkline(self, color, column):
+        sparkline = Sparkline(master=self._frame, color=color, bg_color=COLOR.GRAY)
+
+        sparkline.grid(
+            row = 0,
+            column = column,
+            padx=(10, 0),
+        )
+
+        return sparkline
 
     def create_label(self, title, column, textvariable=None, text=None):
         title_label =  CTkLabel(
@@ -86,7 +121,7 @@ class LogsTopBar:
         title_label.grid(
             row = 0,
             column = column,
-            padx=(column == 1 and FRAME_GAP * 1.5 or 65, 10),
+            padx=(column == 1 and FRAME_GAP * 1.5 or 40, 10),
         )
 
         value_label.grid(
@@ -94,38 +129,110 @@ class LogsTopBar:
             column = column + 1,
         )
 
-    def update_memory(self):
-        if not self.server.is_running():
+    def attach(self, server):
+        """
+        Args:
+            server (DedicatedServerShard): the shard to show the stats of.
+        """
+
+        self.server = server
+        self.shard = server.shard
+
+        self.shard_name.set(STRINGS.SHARD_NAME[self.shard.upper()] or self.shard)
+        self.status_circle.set_color(COLOR.WHITE)
+
+        self.update_boot_timeline(server.boot_timeline)
+
+        self.memory_sparkline.set_values(server.metrics.get_trend(METRIC.MEMORY))
+        self.cpu_sparkline.set_values(server.metrics.get_trend(METRIC.CPU))
+
+        self.update_lag()
+
+    def detach(self):
+        self.server = self.shard = None
+
+        self.memory.set("--")
+        self.cpu.set("--")
+        self.lag.set("--")
+        self.store_stats.set("--")
+
+        self.memory_sparkline.clear()
+        self.cpu_sparkline.clear()
+        self.lag_sparkline.clear()
+
+    def update_process_stats(self):
+        sample = self.server.process_sample # Taken by the MetricsCollector, see DedicatedServerShard.on_process_sample.
+
+        if sample is None:
             self.memory.set("--")
+            self.cpu.set("--")
+            return
 
-            return True, None
+        self.memory_sparkline.set_values(self.server.metrics.get_trend(METRIC.MEMORY))
+        self.cpu_sparkline.set_values(self.server.metrics.get_trend(METRIC.CPU))
 
-        memory, memory_percent = get_memory_usage(pid=self.server.process.pid)
+        self.memory.set(STRINGS.LOG_SCREEN.SHARD_MEMORY_FMT.format(mb=round(sample.rss / 1000 / 1000, 2), percent=round(sample.memory_percent)))
+        self.cpu.set(STRINGS.LOG_SCREEN.SHARD_PERCENT_FMT.format(percent=round(sample.cpu_percent)))
 
-        if not (memory and memory_percent):
-            return True, None
+    def update_lag(self):
+        lag = self.server.metrics.get_last(METRIC.LAG) # Reported by the shard, see DedicatedServerShard.on_telemetry.
 
-        memory_mb = memory / 1000 / 1000
+        if lag is None:
+            self.lag.set("--")
+            self.lag_sparkline.clear()
+            return
 
-        self.memory.set(STRINGS.LOG_SCREEN.SHARD_MEMORY_FMT.format(mb=round(memory_mb, 2), percent=round(memory_percent)))
+        self.lag_sparkline.set_values(self.server.metrics.get_trend(METRIC.LAG))
 
-        return True, None
+        self.lag.set(STRINGS.LOG_SCREEN.SHARD_PERCENT_FMT.format(percent=round(lag)))
 
-    def _open_shard_folder(self):
-        open_folder(Path(self.server.app.cluster_entry.get()) / self.shard)
+    def update_store_stats(self, store):
+        """
+        Args:
+            store (LineStore, SegmentStore, LogFileStore): the shard output lines.
+        """
 
-    def start_tracking_memory(self):
-        self.update_memory()
-        self.memory_task = PeriodicTask(self.root, time=2500, func=self.update_memory)
+        if store.dropped:
+            fmt = STRINGS.LOG_SCREEN.SHARD_LINES_DROPPED_FMT
 
-    def stop_tracking_memory(self):
-        task = getattr(self, "memory_task", None)
+        elif store.peak:
+            fmt = STRINGS.LOG_SCREEN.SHARD_LINES_PEAK_FMT
 
-        if isinstance(task, PeriodicTask):
-            self.memory_task.kill()
-            self.memory_task = None
+        else:
+            fmt = STRINGS.LOG_SCREEN.SHARD_LINES_FMT
 
-            self.memory.set("--")
+        text = fmt.format(
+            lines=len(store),
+            mb=round(store.size / 1000 / 1000, 1),
+            peak=round(store.peak / 1000 / 1000, 1),
+            dropped=store.dropped,
+        )
+
+        if self.store_stats.get() != text:
+            self.store_stats.set(text)
+
+    def update_boot_timeline(self, timeline):
+        """
+        Args:
+            timeline (BootTimeline, None): the current launch timeline of the shard, None if it wasn't launched by Vox.
+        """
+
+        if timeline is None:
+            self.boot_timeline.set("--")
+            return
+
+        # Spawning takes a few milliseconds, not worth the space.
+        phases = [(phase, seconds) for phase, seconds in timeline.get_phases() if phase != BOOT_PHASE.SPAWN]
+
+        text = " › ".join(
+            STRINGS.LOG_SCREEN.BOOT_PHASE_FMT.format(name=STRINGS.LOG_SCREEN.BOOT_PHASES[phase] or phase, seconds=round(seconds, 1))
+            for phase, seconds in phases
+        )
+
+        self.boot_timeline.set(text or "--")
+
+    def _open_shard_folder(self):
+        open_folder(Path(self.server.app.cluster_entry.get()) / self.shard)
 
     def show(self):
         self._frame.place(
@@ -137,19 +244,177 @@ class LogsTopBar:
         self._frame.place_forget()
 
 
+class LogSearchBar:
+    """
+    Search box of the log panel, shown with Ctrl+F.
+    Enter searches, or moves to the next result if the text didn't change. Shift+Enter moves to the previous result.
+
+    Args:
+        master (CTkFrame): the log panel frame.
+        on_search (function): called with the text to search.
+        on_move (function): called with 1 or -1, to move to the next or previous result.
+        on_close (function): called when the search is closed.
+    """
+
+    def __init__(self, master, on_search, on_move, on_close) -> None:
+        self.root = master
+        self.on_search = on_search
+        self.on_move = on_move
+        self.on_close = on_close
+
+        self.visible = False
+        self.query = None
+        self.status = StringVar(value="")
+
+        self._frame = CustomFrame(
+            master=self.root,
+            color=COLOR.GRAY,
+            size=SIZE.LOGS_SEARCH_BAR,
+            corner_radius=10,
+        )
+
+        self.entry = CTkEntry(
+            master = self._frame,
+            corner_radius=8,
+            border_width=0,
+            text_color=COLOR.WHITE,
+            fg_color=COLOR.DARK_GRAY,
+            font=FONT.TEXTBOX,
+            width=SIZE.LOGS_SEARCH_BAR.w * 0.5,
+            height=SIZE.LOGS_SEARCH_BAR.h - 10,
+            placeholder_text=STRINGS.LOG_SCREEN.SEARCH_PLACEHOLDER,
+        )
+
+        self.entry._entry.configure(selectbackground=COLOR.GRAY_HOVER)
+
+        self.entry.grid(row=0, column=0, padx=(5, 10), pady=5)
+
+        self.status_label = CTkLabel(
+            master=self._frame,
+            height=0,
+            anchor="w",
+            textvariable=self.status,
+            text_color=COLOR.WHITE_HOVER,
+            font=FONT.CLUSTER_STATS,
+        )
+
+        self.status_label.grid(row=0, column=1, sticky="w")
+
+        self._frame.grid_columnconfigure(1, weight=1)
+        self._frame.grid_propagate(False)
+
+        for column, (text, command) in enumerate([("▲", lambda: self.on_move(-1)), ("▼", lambda: self.on_move(1)), ("✕", self.close)]):
+            CTkButton(
+                master=self._frame,
+                text=text,
+                command=command,
+                corner_radius=8,
+                fg_color=COLOR.DARK_GRAY,
+                hover_color=COLOR.GRAY_HOVER,
+                text_color=COLOR.WHITE,
+                width=SIZE.LOGS_SEARCH_BAR.h - 10,
+                height=SIZE.LOGS_SEARCH_BAR.h - 10,
+                font=FONT.TEXTBOX,
+            ).grid(row=0, column=column + 2, padx=(0, 5))
+
+        self.entry.bind("<Return>", self._on_return)
+        self.entry.bind("<Shift-Return>", self._on_shift_return)
+        self.entry.bind("<Escape>", self.close)
+
+    def _on_return(self, *args):
+        query = self.entry.get()
+
+        if query == self.query:
+            self.on_move(1)
+        else:
+            self.query = query
+            self.on_search(query)
+
+        return "break"
+
+    def _on_shift_return(self, *args):
+        self.on_move(-1)
+
+        return "break"
+
+    def set_status(self, text):
+        self.status.set(text)
+
+    def show(self):
+        self.visible = True
+
+        self._frame.place(
+            x=OFFSET.LOGS_SEARCH_BAR.x,
+            y=OFFSET.LOGS_SEARCH_BAR.y,
+        )
+
+        self._frame.lift()
+        self.entry.focus_set()
+
+    def close(self, *args):
+        if not self.visible:
+            return "break"
+
+        self.visible = False
+        self.query = None
+
+        self._frame.place_forget()
+        self.set_status("")
+
+        self.on_close()
+
+        return "break" # Escape would close the log panel too.
+
+
 class ShardLogPanel():
     switch_xpad = 20
 
-    def __init__(self, master, shard, server) -> None:
-        self.server = server
+    LOG_FILE_LINES = 2000 # Lines of server_log.txt loaded at once, from the end.
+    HIGHLIGHT_CONTEXT_LINES = 2000 # Lines above a highlighted range scanned back for the line a multi-line highlight starts or ends at.
+    HIGHLIGHT_MARGIN_LINES = 100  # Lines highlighted above and below the visible ones.
+    HIGHLIGHT_BATCH_SIZE = 1000   # Highlight ranges applied to the textbox per batch.
+    HIGHLIGHT_BATCH_INTERVAL = 16 # Milliseconds between batches, about a frame.
+    SEARCH_LIMIT = 5000           # Results per search.
+    SEARCH_SLICE_TIME = 8         # Milliseconds of store search per main loop iteration.
+    FLUSH_INTERVAL = 33           # Minimum milliseconds between renders of new lines, about 30 per second.
+
+    def __init__(self, master) -> None:
+        self.server = None
+        self.log = None # The ShardLog of server.
         self.master = master
         self.bind = None
         self._auto_scroll = False
         self._visible = False
-        self.shard = shard
+        self.shard = None
         self.corner_radius = 10
-        self.highlight_data = []
-        self._highlight_end = "1.0"
+        self.highlighter = Highlighter()
+
+        # Only the visible lines of the textbox get highlighted, one byte per textbox line tells which ones are.
+        self._highlighted = bytearray()
+        self._highlight_start = 0         # Store index of the first line of _highlighted.
+        self._highlight_state_line = None # Store index of the line the highlighter state is at.
+        self._highlight_job = None
+
+        # Highlights are found by HIGHLIGHT_WORKER, and applied here in batches.
+        # Results from before the last reset have an older generation and are dropped.
+        self._highlight_generation = 0
+        self._pending_spans = collections.deque() # [store line, spans, next span index]
+        self._apply_job = None
+
+        # Every line of the session lives in log.store, the textbox only shows a window of it.
+        self._flush_job = None
+        self._last_flush = 0
+
+        self.search_bind = None
+        self._search_generation = 0
+        self._search_query = None
+        self._search_scan = None # Generator searching the shard stores, a slice at a time.
+        self._search_job = None
+        self._search_results = []
+        self._search_position = -1
+        self._search_done = False
+        self._search_sources = {} # Path -> shard, of the files being searched.
+        self._history_stores = {} # Path -> LogFileStore, of the files with results.
 
         self.root = CustomFrame(
             master=master,
@@ -159,7 +424,7 @@ class ShardLogPanel():
             corner_radius=self.corner_radius,
         )
 
-        self.topbar = LogsTopBar(master=self.root, server=self.server, shard=self.shard)
+        self.topbar = LogsTopBar(master=self.root)
 
         self.textbox = CTkTextbox(
             master = self.root,
@@ -177,12 +442,16 @@ class ShardLogPanel():
         #self.textbox.bind("<MouseWheel>", self._mouse_scroll_event)
 
         self.textbox._textbox.configure(selectbackground=COLOR.GRAY)
+        self.textbox.tag_config("search", background=COLOR.CONSOLE_SEARCH)
 
         self.add_highlight(pattern=r'\[\d{2}:\d{2}:\d{2}\]:', name="timestamp", color=COLOR.CONSOLE_GRAY)
         self.add_highlight(pattern=r'World \d* is now connected', name="online", color=COLOR.GREEN)
         self.add_highlight(pattern=r'RemoteCommandInput:.*?[\n\r]+', name="remotecommand", color=COLOR.LIGHT_BLUE)
         self.add_highlight(pattern=r'\[Warning\].*?[\n\r]+', name="warnings", color=COLOR.YELLOW)
-        self.add_highlight(pattern=r'(?<=\[\d{2}:\d{2}:\d{2}\]: )(\[string ".*?)(?=\[\d{2}:\d{2}:\d{2}\]:|\Z)', name="crash", color="#e88a84", flags=re.DOTALL)
+        # Lua errors, from the [string "..." line until the next timestamped line.
+        self.add_block_highlight(start_pattern=r'\[\d{2}:\d{2}:\d{2}\]: (\[string ")', end_pattern=r'\[\d{2}:\d{2}:\d{2}\]:', name="crash", color="#e88a84")
+
+        self.view = LogView(textbox=self.textbox, store=LineStore(), on_render=self._on_view_render, on_scroll=self._schedule_highlight, on_top=self._on_view_top)
 
         self.textbox.place(
             x = OFFSET.LOGS_TEXTBOX.x,
@@ -199,7 +468,6 @@ class ShardLogPanel():
             border_width=0,
             width=SIZE.LOGS_ENTRY.w,
             height=SIZE.LOGS_ENTRY.h,
-            placeholder_text=STRINGS.LOG_SCREEN.ENTRY_PLACEHOLDER.format(shard=STRINGS.SHARD_NAME[self.shard.upper()] or self.shard),
         )
 
         self.entry._entry.configure(selectbackground=COLOR.GRAY)
@@ -267,9 +535,54 @@ class ShardLogPanel():
         self.auto_scroll_switch._canvas.grid(    row=0, column=0, sticky="",  padx=(self.switch_xpad, 10))
         self.auto_scroll_switch._text_label.grid(row=0, column=2, sticky="w", padx=(0, self.switch_xpad))
 
-        self.hide()
+        self.search_bar = LogSearchBar(master=self.root, on_search=self.search, on_move=self.move_search_result, on_close=self.close_search)
 
-        self.server.shard_frame.add_status_change_callback(self.on_server_status_changed)
+        self._hide()
+
+    def attach(self, server):
+        """
+        Shows the output and state of a shard. The panel must be detached from its previous shard first.
+
+        Args:
+            server (DedicatedServerShard): the shard.
+        """
+
+        self.server = server
+        self.shard = server.shard
+        self.log = server.log
+        self.log.panel = self
+
+        self.topbar.attach(server)
+
+        # Needs to enable it before setting the string.
+        self.entry.configure(state=NORMAL)
+        self.entry.configure(placeholder_text=STRINGS.LOG_SCREEN.ENTRY_PLACEHOLDER.format(shard=STRINGS.SHARD_NAME[self.shard.upper()] or self.shard))
+
+        if not server.shard_frame.is_offline():
+            self.on_server_status_changed()
+
+        self.on_store_changed()
+
+    def detach(self):
+        """ Hides the panel and resets its state, ready to be attached to another shard. """
+
+        self._hide()
+
+        self.search_bar.close()
+        self.search_bar.entry.delete(0, END)
+
+        self.log.panel = None
+        self.server = self.log = self.shard = None
+
+        self.view.store = LineStore()
+        self.view.reset()
+        self._reset_highlight()
+
+        self.topbar.detach()
+
+        self.entry.delete(0, END)
+        self.auto_scroll_switch.deselect()
+        self._auto_scroll = False
 
     def show(self, *args, **kwargs):
         self._visible = True
@@ -280,49 +593,49 @@ class ShardLogPanel():
         )
 
         self.bind = self.master.bind("<Escape>", self.hide)
+        self.search_bind = self.master.bind("<Control-f>", self.open_search)
 
         self.root.lift()
-        self.highlight_text()
-
-        if self.server.is_running():
-            self.show_end()
 
-            self.topbar.start_tracking_memory()
+        self._flush_lines() # Lines buffered while hidden.
 
-        elif not self.textbox.get("1.0", END).strip():
-            # Using after() to safely update UI from main thread.
-            read_file_nonblocking(
-                Path(self.server.app.cluster_entry.get()) / self.shard / "server_log.txt",
-                lambda text: self.root.after(0, self.on_load_log_file, text)
-            )
+        if self.server.is_running() or self.server.is_attached():
+            self.show_end()
 
-            self.reset_text()
+            self.topbar.update_process_stats()
 
-            logger.debug(f"Loading log file for {self.shard}.")
+        elif not len(self.log.store):
+            self.load_log_file()
 
 
     def hide(self, *args, **kwargs):
         if self.master.grab_current() is not None:
             return # Not in focus...
 
+        self._hide()
+
+    def _hide(self):
         self._visible = False
         self.root.place_forget()
 
-        self.topbar.stop_tracking_memory()
+        self._cancel_flush()
 
         if self.bind:
             self.master.unbind("<Escape>", self.bind)
             self.bind = None
 
+        if self.search_bind:
+            self.master.unbind("<Control-f>", self.search_bind)
+            self.search_bind = None
+
     def on_server_status_changed(self, *args):
         if self.server.shard_frame.is_starting():
-            self.reset_text()
-
             # Needs to enable it before setting the string.
             self.entry.configure(state=NORMAL)
             self.entry.configure(placeholder_text=STRINGS.LOG_SCREEN.ENTRY_PLACEHOLDER.format(shard=STRINGS.SHARD_NAME[self.shard.upper()] or self.shard))
 
             self.topbar.status_circle.set_color(COLOR.YELLOW)
+            self.topbar.update_lag() # Cleared for the new launch.
 
         elif self.server.shard_frame.is_stopping() or self.server.shard_frame.is_restarting():
             self.topbar.status_circle.set_color(COLOR.YELLOW)
@@ -336,10 +649,18 @@ class ShardLogPanel():
             self.entry.configure(placeholder_text=STRINGS.LOG_SCREEN.ENTRY_PLACEHOLDER_OFFLINE)
             self.entry.configure(state=DISABLED)
 
-            self.topbar.stop_tracking_memory()
+            self.topbar.update_process_stats()
 
             self.topbar.status_circle.set_color(COLOR.WHITE)
 
+    def on_process_sampled(self):
+        if self._visible:
+            self.topbar.update_process_stats()
+
+    def on_telemetry(self):
+        if self._visible:
+            self.topbar.update_lag()
+
     def execute_command(self, *args, **kwargs):
         command = self.entry.get()
 
@@ -348,155 +669,402 @@ class ShardLogPanel():
             self.entry.delete(0, END)
             self.show_end()
 
-    def append_text(self, text):
-        self.textbox.configure(state=NORMAL) # To be able to insert text!
-        self.textbox.insert(END, text)
-        self.textbox.configure(state=DISABLED)
+    def on_lines_appended(self):
+        """
+        Called by the ShardLog when lines were added to its store. While the panel is visible, the view shows them at most every FLUSH_INTERVAL,
+        if it's following the end. Hidden panels show them once, in show().
+        """
 
-        if self._visible:
-            self.highlight_text(incremental=True)
+        if self._visible and self._flush_job is None:
+            elapsed = (time.perf_counter() - self._last_flush) * 1000
+
+            self._flush_job = self.root.after(max(1, int(self.FLUSH_INTERVAL - elapsed)), self._flush_lines)
+
+    def _cancel_flush(self):
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+            self._flush_job = None
 
-            if self._auto_scroll:
+    def _flush_lines(self):
+        self._cancel_flush()
+        self._last_flush = time.perf_counter()
+
+        if self.view.sync() and self._visible:
+            if self._auto_scroll and not self.search_bar.visible:
                 self.show_end()
 
             else:
                 self._mouse_scroll_event()
 
-    def append_text_from_file(self, text):
-        # Cancel any ongoing insert
-        if hasattr(self, "_append_job"):
-            self.root.after_cancel(self._append_job)
+        self.topbar.update_store_stats(self.log.store)
 
-        self.textbox.configure(state=NORMAL)
+    def load_log_file(self):
+        """ Shows the shard server_log.txt, starting from its last lines. Older lines are loaded when scrolling to the top. """
 
-        MAX_LINES = 10000
+        self.log.load_log_file(self.LOG_FILE_LINES)
 
-        self._append_lines = text.splitlines(keepends=True)
-        self._append_index = 0
+        self.show_end()
 
-        if len(self._append_lines) > MAX_LINES:
-            logger.info(f"Truncating log file for shard '{self.shard}' because it exceeds the maximum allowed {MAX_LINES} lines.")
+    def _on_view_top(self):
+        store = self.view.store
 
-            truncation_message = (
-                f">> This log has been truncated to the last {MAX_LINES} lines.\n\n"
-            )
+        if not isinstance(store, LogFileStore):
+            return
+
+        count = store.load_older(self.LOG_FILE_LINES)
+
+        if count:
+            self.view.prepend(count)
+            self.topbar.update_store_stats(self.log.store)
+
+    def on_store_changed(self):
+        """ Called by the ShardLog when its store was replaced, and when the panel is attached to it. """
 
-            # Keep only the last MAX_LINES lines and prepend the message
-            self._append_lines = [truncation_message] + self._append_lines[-MAX_LINES:]
+        self._cancel_flush()
 
-        # Reset highlight while we're inserting
-        for h in self.highlight_data:
-            self.textbox.tag_remove(h.name, "1.0", END)
+        self.view.store = self.log.store
+        self.view.reset()
+        self._reset_highlight()
 
-        self._append_next_chunk()
+        self.topbar.update_store_stats(self.log.store)
 
-    def _append_next_chunk(self):
-        if self._append_index >= len(self._append_lines):
-            self._append_lines = []
-            self._append_index = 0
+    # ------------------------------------------------------------------------------ #
 
-            # Final scroll and highlight
-            if self._visible:
-                self.highlight_text()
-                if self._auto_scroll:
-                    self.show_end()
-                else:
-                    self._mouse_scroll_event()
+    def open_search(self, *args):
+        self.search_bar.show()
 
-            self.textbox.configure(state=DISABLED)
+    def search(self, query):
+        """
+        Searches every shard of the cluster: the lines in their stores first, then their log files on disk, in SEARCH_WORKER.
+        Results are shown as they are found.
 
-            logger.debug(f"Loaded log file for {self.shard}.")
+        Args:
+            query (str): the text to find, case insensitive.
+        """
 
+        self._search_generation += 1
+        self._search_query = query
+        self._search_results = []
+        self._search_position = -1
+        self._search_done = False
+        self._search_sources = {}
+        self._history_stores = {}
+
+        self._cancel_search_scan()
+
+        if not query.strip():
+            SEARCH_WORKER.cancel(owner=self)
+            self.search_bar.set_status("")
             return
 
-        text = ''.join(self._append_lines[self._append_index : self._append_index + 500])
+        # This shard first.
+        logs = sorted((frame.server.log for frame in self.server.app.shard_group.get_shards()), key=lambda log: log is not self.log)
+
+        for log in logs:
+            for path in log.get_history_paths():
+                self._search_sources[path] = log.shard
+
+        self.search_bar.set_status(STRINGS.LOG_SCREEN.SEARCH_SEARCHING)
+
+        self._search_scan = self._scan_stores(query, logs)
+        self._search_stores()
+
+    def _scan_stores(self, query, logs):
+        """ Adds the results from the stores of logs to _search_results. Yields after each block of lines read. """
+
+        for log in logs:
+            store = log.store
+
+            if isinstance(store, LogFileStore):
+                continue # server_log.txt, searched by SEARCH_WORKER.
+
+            for lines in log.index.search_blocks(query, store.get_raw):
+                if log.store is not store:
+                    break # Replaced meanwhile, and its index cleared.
 
-        start_idx = self.textbox.index(END)
-        self.textbox.insert(END, text)
-        self._highlight_range(start_idx, text)
+                self._search_results.extend(
+                    SearchResult(shard=log.shard, source=STRINGS.LOG_SCREEN.SEARCH_SESSION, store=store, line=line) for line in lines
+                )
+
+                yield
+
+    def _search_stores(self):
+        """ Runs the store search for up to SEARCH_SLICE_TIME, then lets the main loop breathe. Once done, the files are searched. """
 
-        self._append_index += 500
-        self._append_job = self.root.after(1, self._append_next_chunk)
+        self._search_job = None
 
-    def reset_text(self):
-        self.textbox.configure(state=NORMAL) # To be able to delete text!
-        self.textbox.delete("1.0", END)
-        self.textbox.configure(state=DISABLED)
-        self._highlight_end = "1.0"
+        started = time.perf_counter()
 
-    def on_load_log_file(self, text=None):
-        if text and not self.server.is_running():
-            self.reset_text()
-            self.append_text_from_file(text)
+        for _ in self._search_scan:
+            if len(self._search_results) >= self.SEARCH_LIMIT:
+                del self._search_results[self.SEARCH_LIMIT:]
+                break
+
+            if (time.perf_counter() - started) * 1000 > self.SEARCH_SLICE_TIME:
+                self._search_job = self.root.after(1, self._search_stores)
+                self._show_search_progress()
+                return
+
+        self._search_scan = None
+
+        event_queue = self.root.winfo_toplevel().event_queue
+        callback = functools.partial(event_queue.put, self._on_search_results, self._search_generation)
+
+        event_queue.add_producer() # Until the search is done.
+
+        SEARCH_WORKER.search(
+            self._search_query,
+            list(self._search_sources),
+            callback,
+            limit=max(0, self.SEARCH_LIMIT - len(self._search_results)),
+            owner=self,
+        )
+
+        self._show_search_progress()
+
+    def _cancel_search_scan(self):
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+
+        self._search_scan = None
+
+    def _on_search_results(self, generation, results, done):
+        if done:
+            self.root.winfo_toplevel().event_queue.remove_producer()
+
+        if generation != self._search_generation or not self.root.winfo_exists():
+            return
+
+        for index, line in results:
+            store = self._history_stores.get(index.path)
+
+            if store is None:
+                store = self._history_stores[index.path] = LogFileStore(index.path, offsets=array("Q", index.offsets), size=index.size)
+
+            self._search_results.append(SearchResult(shard=self._search_sources[index.path], source=index.path.name, store=store, line=line))
+
+        self._search_done = done
+
+        self._show_search_progress()
+
+    def _show_search_progress(self):
+        if self._search_position == -1 and self._search_results:
+            self.move_search_result(1)
+        else:
+            self._update_search_status()
+
+    def move_search_result(self, step):
+        """ Shows the next (step 1) or previous (step -1) search result. """
+
+        if not self._search_results:
+            return
+
+        self._search_position = (self._search_position + step) % len(self._search_results)
+
+        result = self._search_results[self._search_position]
+
+        # Results from other stores are shown in place of this shard's, until the search is closed.
+        if self.view.store is not result.store:
+            self.view.store = result.store
+            self._reset_highlight() # The highlighter state is about the lines of the previous store.
+
+        self.view.render(result.line - self.view.get_visible_line_count() // 2)
+
+        self._update_search_status()
+
+    def _tag_search_result(self):
+        self.textbox.tag_remove("search", "1.0", END)
+
+        if self._search_position == -1:
+            return
+
+        result = self._search_results[self._search_position]
+
+        if result.store is self.view.store and self.view.window_start <= result.line < self.view.window_end:
+            row = result.line - self.view.window_start + 1
+
+            self.textbox.tag_add("search", f"{row}.0", f"{row + 1}.0")
+
+    def _update_search_status(self):
+        if not self._search_results:
+            self.search_bar.set_status(self._search_done and STRINGS.LOG_SCREEN.SEARCH_NO_RESULTS or STRINGS.LOG_SCREEN.SEARCH_SEARCHING)
+            return
+
+        result = self._search_results[self._search_position]
+
+        self.search_bar.set_status(
+            STRINGS.LOG_SCREEN.SEARCH_RESULT_FMT.format(
+                position = self._search_position + 1,
+                count = len(self._search_results),
+                more = not self._search_done and "+" or "",
+                shard = STRINGS.SHARD_NAME[result.shard.upper()] or result.shard,
+                source = result.source,
+            )
+        )
+
+    def close_search(self):
+        self._cancel_search_scan()
+
+        SEARCH_WORKER.cancel(owner=self)
+
+        self._search_generation += 1
+        self._search_results = []
+        self._search_position = -1
+        self._history_stores = {}
+
+        self.textbox.tag_remove("search", "1.0", END)
+
+        if self.view.store is not self.log.store:
+            self.view.store = self.log.store
+            self._reset_highlight()
+            self.view.render(len(self.log.store))
+
+        self.entry.focus_set()
 
     def show_end(self):
-        self.textbox.see(END)
+        self.view.show_end()
         self._mouse_scroll_event()
 
     def add_highlight(self, pattern, name, color, flags=0):
         self.textbox.tag_config(name, foreground=color)
 
-        self.highlight_data.append(
-            TextHighlightData(
-                pattern = re.compile(pattern, flags=flags),
-                name = name,
-            )
-        )
+        self.highlighter.add(pattern=pattern, name=name, flags=flags)
 
-    def _char_to_index(self, text, char_pos, base_line=1, base_col=0):
-        prefix = text[:char_pos]
-        newlines = prefix.count('\n')
+    def add_block_highlight(self, start_pattern, end_pattern, name, color):
+        self.textbox.tag_config(name, foreground=color)
 
-        if newlines == 0:
-            return f"{base_line}.{base_col + char_pos}"
+        self.highlighter.add_block(name=name, start_pattern=start_pattern, end_pattern=end_pattern)
 
-        last_newline = prefix.rfind('\n')
-        col = char_pos - last_newline - 1
-        return f"{base_line + newlines}.{col}"
+    def _on_view_render(self, start_idx, text, full):
+        if full:
+            self._reset_highlight()
+            self._tag_search_result()
+        else:
+            self._highlighted.extend(bytes(self.view.window_end - self._highlight_start - len(self._highlighted)))
 
-    def _highlight_range(self, start_idx, text):
-        parts = str(start_idx).split('.')
-        base_line = int(parts[0])
-        base_col = int(parts[1])
+        self._highlight_visible()
 
-        for highlight in self.highlight_data:
-            if highlight.pattern.flags & re.DOTALL:
-                continue
+    def _reset_highlight(self):
+        self._highlighted = bytearray(self.view.window_size)
+        self._highlight_start = self.view.window_start
+        self._highlight_state_line = None
 
-            for match in highlight.pattern.finditer(text):
-                s, e = match.span()
-                self.textbox.tag_add(
-                    highlight.name,
-                    self._char_to_index(text, s, base_line, base_col),
-                    self._char_to_index(text, e, base_line, base_col),
-                )
+        self._highlight_generation += 1
+        self._pending_spans.clear()
 
-    def highlight_text(self, incremental=False):
-        if incremental:
-            start = self._highlight_end
-            text = self.textbox.get(start, END)
+        if self._apply_job is not None:
+            self.root.after_cancel(self._apply_job)
+            self._apply_job = None
 
-            if not text.strip():
-                return
+    def _schedule_highlight(self):
+        if self._highlight_job is None:
+            self._highlight_job = self.root.after_idle(self._highlight_visible)
+
+    def _highlight_visible(self):
+        """ Highlights the visible lines, and a margin around them, that weren't yet. """
+
+        if self._highlight_job is not None:
+            self.root.after_cancel(self._highlight_job)
+            self._highlight_job = None
 
-            self._highlight_range(self.textbox.index(start), text)
-            self._highlight_end = self.textbox.index(END)
+        if not self._highlighted:
             return
 
-        text = self.textbox.get("1.0", END)
+        # Lines trimmed from the top of the window since.
+        trimmed = self.view.window_start - self._highlight_start
 
-        for highlight in self.highlight_data:
-            self.textbox.tag_remove(highlight.name, "1.0", END)
-
-            for match in highlight.pattern.finditer(text):
-                s, e = match.span()
-                self.textbox.tag_add(
-                    highlight.name,
-                    self._char_to_index(text, s),
-                    self._char_to_index(text, e),
-                )
+        if trimmed > 0:
+            del self._highlighted[:trimmed]
+            self._highlight_start = self.view.window_start
+
+        first, last = self.view.get_visible_rows()
+
+        start = max(0, first - 1 - self.HIGHLIGHT_MARGIN_LINES)
+        end = min(len(self._highlighted), last + self.HIGHLIGHT_MARGIN_LINES)
+
+        while start < end:
+            start = self._highlighted.find(0, start, end)
+
+            if start == -1:
+                break
+
+            stop = self._highlighted.find(1, start, end)
+            stop = stop == -1 and end or stop
+
+            self._highlight_lines(start, stop)
+
+            start = stop
+
+    def _highlight_lines(self, start, stop):
+        """
+        Args:
+            start (int): textbox line, 0 based, of the first line to highlight.
+            stop (int): textbox line after the last one.
+        """
+
+        line = self._highlight_start + start
+        context = None
+
+        if line != self._highlight_state_line:
+            # The lines may start in the middle of a block, look at the lines above them.
+            context = self.view.store.get_text(line - self.HIGHLIGHT_CONTEXT_LINES, line)
+
+        text = self.view.store.get_text(line, self._highlight_start + stop)
+
+        event_queue = self.root.winfo_toplevel().event_queue
+        callback = functools.partial(event_queue.put, self._on_highlight_spans, self._highlight_generation, line)
+
+        event_queue.add_producer() # Until the spans are handed.
+
+        HIGHLIGHT_WORKER.put(self.highlighter, text, context, callback)
+
+        self._highlighted[start:stop] = b"\x01" * (stop - start)
+        self._highlight_state_line = self._highlight_start + stop
+
+    def _on_highlight_spans(self, generation, line, spans):
+        self.root.winfo_toplevel().event_queue.remove_producer()
+
+        if generation != self._highlight_generation or not spans or not self.textbox.winfo_exists():
+            return
+
+        self._pending_spans.append([line, spans, 0])
+
+        if self._apply_job is None:
+            self._apply_highlight_batch()
 
-        self._highlight_end = self.textbox.index(END)
+    def _apply_highlight_batch(self):
+        """ Applies up to HIGHLIGHT_BATCH_SIZE pending highlight ranges, with a single Tk call per tag. """
+
+        self._apply_job = None
+
+        budget = self.HIGHLIGHT_BATCH_SIZE
+        ranges = {}
+
+        while self._pending_spans and budget > 0:
+            pending = self._pending_spans[0]
+            line, spans, first = pending
+
+            # The window may have been trimmed since the lines were sent.
+            offset = line - self.view.window_start + 1
+            last = min(len(spans), first + budget)
+
+            for name, (start_line, start_column), (end_line, end_column) in spans[first:last]:
+                if start_line + offset >= 1:
+                    ranges.setdefault(name, []).extend((f"{start_line + offset}.{start_column}", f"{end_line + offset}.{end_column}"))
+
+            budget -= last - first
+
+            if last == len(spans):
+                self._pending_spans.popleft()
+            else:
+                pending[2] = last
+
+        for name, args in ranges.items():
+            self.textbox._textbox.tag_add(name, *args)
+
+        if self._pending_spans:
+            self._apply_job = self.root.after(self.HIGHLIGHT_BATCH_INTERVAL, self._apply_highlight_batch)
 
     def _mouse_scroll_event(self, *args, **kwargs):
         pass
@@ -595,12 +1163,12 @@ class ShardFrame(CustomFrame):
         )
 
         self.server = DedicatedServerShard(self._master, self)
-        self.shard_log_panel = ShardLogPanel(master=app, shard=code, server=self.server)
+        self.shard_log_panel = None # Taken from the shard group pool the first time it's shown.
 
         self.logs = RelativeXImageButton(
             master=self,
             image="assets/console.png",
-            command=self.shard_log_panel.show,
+            command=self.show_log_panel,
             width=SIZE.LOGS_BUTTON.w,
             height=SIZE.LOGS_BUTTON.h,
             image_size=(SIZE.LOGS_BUTTON.w - 20, SIZE.LOGS_BUTTON.h - 20),
@@ -635,6 +1203,26 @@ class ShardFrame(CustomFrame):
 
         self.set_offline()
 
+        self.add_status_change_callback(self.on_status_changed)
+
+    def on_status_changed(self, *args):
+        if self.is_starting():
+            self.server.log.start_session()
+
+        if self.shard_log_panel is not None:
+            self.shard_log_panel.on_server_status_changed()
+
+    def show_log_panel(self):
+        if self.shard_log_panel is None:
+            self.shard_log_panel = self._master.shard_group.get_log_panel(self.server)
+
+        self.shard_log_panel.show()
+
+    def release_log_panel(self):
+        if self.shard_log_panel is not None:
+            self._master.shard_group.release_log_panel(self.shard_log_panel)
+            self.shard_log_panel = None
+
     def set_offline(self):
         self.status.set(SERVER_STATUS.OFFLINE)
 
@@ -725,6 +1313,8 @@ class ShardFrame(CustomFrame):
         self.status_msg.set(STRINGS.SHARD_STATUS.ONLINE)
         self.status_circle.set_color(COLOR.GREEN)
 
+        self.server.execute_command(load_lua_file("telemetry", interval=str(TELEMETRY_INTERVAL)), log=False)
+
         if self.is_master:
             self._master.launch_button.set_style(text=STRINGS.LAUNCH_BUTTON.SAVE_QUIT)
 
@@ -750,14 +1340,23 @@ class ShardFrame(CustomFrame):
     def is_offline(self):
         return self.status.get() == SERVER_STATUS.OFFLINE
 
-    def add_text_to_log_screen(self, text):
-        self.shard_log_panel.append_text(text)
+    def on_process_sampled(self):
+        if self.shard_log_panel is not None:
+            self.shard_log_panel.on_process_sampled()
+
+    def on_telemetry(self):
+        if self.shard_log_panel is not None:
+            self.shard_log_panel.on_telemetry()
+
+    def update_boot_timeline(self, timeline):
+        if self.shard_log_panel is not None:
+            self.shard_log_panel.topbar.update_boot_timeline(timeline)
 
     def add_status_change_callback(self, cb):
         self.status.trace_add("write", cb)
 
     def cleanup_state(self):
-        self.shard_log_panel.reset_text()
+        self.server.log.reset()
 
 
 class TextBoxAsLabel(CTkTextbox):
@@ -812,12 +1411,20 @@ class TextBoxAsLabel(CTkTextbox):
 
 
 class ScrollableShardGroupFrame(CTkScrollableFrame):
+    EXTERNAL_SCAN_DELAY = 500 # Milliseconds the cluster entry must stay unchanged before scanning for external shards.
+
     def __init__(self, master, color, pos, size, corner_radius=15, border_color=None, bg_color="transparent", **kwargs):
         self.pos = pos
 
         self.shards = {}
         self.app = master
 
+        # Log panels are only created when a shard console is first opened, and kept here for reuse when the shards change.
+        self.log_panels = []
+
+        self._external_scan_job = None
+        self._external_scan_generation = 0 # Only the results of the last scan are used.
+
         self._width = size.w - (corner_radius * 2)
         self._height = size.h - corner_radius
 
@@ -887,10 +1494,12 @@ class ScrollableShardGroupFrame(CTkScrollableFrame):
 
     def remove_all_shards(self):
         for frame in self.get_shards(include_placeholders=True):
-            frame.destroy()
+            if hasattr(frame, "server"):
+                frame.server.detach()
+                frame.release_log_panel()
+                frame.server.log.close()
 
-            if hasattr(frame, "shard_log_panel"):
-                frame.shard_log_panel.root.destroy()
+            frame.destroy()
 
         self.shards = {}
 
@@ -898,11 +1507,75 @@ class ScrollableShardGroupFrame(CTkScrollableFrame):
 
         self.app.launch_button.disable()
 
+    def get_log_panel(self, server):
+        """
+        Returns:
+            panel (ShardLogPanel): a panel from the pool, or a new one if it's empty, attached to server.
+        """
+
+        panel = self.log_panels and self.log_panels.pop() or ShardLogPanel(master=self.app)
+        panel.attach(server)
+
+        return panel
+
+    def release_log_panel(self, panel):
+        """ Detaches panel from its shard and puts it back in the pool. """
+
+        panel.detach()
+
+        self.log_panels.append(panel)
+
     def start_all_shards(self):
+        self.app.launch_planner.launch(self.get_shards())
+
+    def attach_external_shards(self):
+        """
+        Follows the shards of the cluster that are already running, started outside of Vox.
+        Listing the processes is slow: it runs in a thread, once the cluster entry stayed unchanged for EXTERNAL_SCAN_DELAY.
+        """
+
+        if self._external_scan_job is not None:
+            self.app.after_cancel(self._external_scan_job)
+
+        self._external_scan_job = self.app.after(self.EXTERNAL_SCAN_DELAY, self._scan_external_shards)
+
+    def _scan_external_shards(self):
+        self._external_scan_job = None
+        self._external_scan_generation += 1
+
+        if all(frame.server.is_running() or frame.server.is_attached() for frame in self.get_shards()):
+            return
+
+        generation = self._external_scan_generation
+        cluster_dir = self.app.cluster_entry.get()
+
+        def _scan():
+            try:
+                processes = find_external_shard_processes(cluster_dir)
+
+            except Exception as e:
+                logger.error(f"Failed to scan for external shards: {e}")
+                processes = {}
+
+            self.app.event_queue.put(self._on_external_shards_found, generation, cluster_dir, processes)
+
+        self.app.event_queue.add_producer() # Until the scan is done.
+
+        threading.Thread(target=_scan, name="ExternalShardScan", daemon=True).start()
+
+    def _on_external_shards_found(self, generation, cluster_dir, processes):
+        self.app.event_queue.remove_producer()
+
+        if generation != self._external_scan_generation or cluster_dir != self.app.cluster_entry.get():
+            return # Outdated.
+
         for frame in self.get_shards():
-            frame.server.start()
+            if frame.code in processes and not (frame.server.is_running() or frame.server.is_attached()):
+                frame.server.attach(processes[frame.code])
 
     def stop_all_shards(self):
+        self.app.launch_planner.cancel()
+
         for frame in self.get_shards():
             frame.server.stop()
 
@@ -968,4 +1641,76 @@ class ColouredCircle(CTkFrame):
         self.configure(
             fg_color = color,
             border_color = color,
-        )
\ No newline at end of file
+        )
+
+class Sparkline(CTkCanvas):
+    """
+    Small line chart of a series of values, scaled to their range. Redrawing only moves the points of a single line item.
+
+    Args:
+        master (CTkFrame): the parent frame.
+        color (str): the line color.
+        bg_color (str): the parent frame color.
+    """
+
+    def __init__(self, master, color, bg_color, size=SIZE.SPARKLINE, **kwargs):
+        self.size = Size(master._apply_widget_scaling(size.w), master._apply_widget_scaling(size.h))
+
+        super().__init__(
+            master=master,
+            width=self.size.w,
+            height=self.size.h,
+            bg=bg_color,
+            highlightthickness=0,
+            **kwargs
+        )
+
+        self.color = color
+        self.lines = [] # Line items, one per run of values between gaps. Kept and moved on redraws.
+
+    def set_values(self, values):
+        """
+        Args:
+            values (list): the values, oldest first. NaN values are gaps in the line.
+        """
+
+        known = [value for value in values if not math.isnan(value)]
+
+        if len(values) < 2 or not known:
+            self.clear()
+            return
+
+        low, high = min(known), max(known)
+        span = high - low or 1
+
+        step = (self.size.w - 2) / (len(values) - 1)
+        height = self.size.h - 2
+
+        runs = [[]]
+
+        for i, value in enumerate(values):
+            if math.isnan(value):
+                if runs[-1]:
+                    runs.append([])
+
+                continue
+
+            runs[-1].append(1 + i * step)
+            runs[-1].append(1 + height - (value - low) / span * height)
+
+        runs = [points for points in runs if points]
+
+        while len(self.lines) < len(runs):
+            self.lines.append(self.create_line(0, 0, 0, 0, fill=self.color, width=1.5))
+
+        for i, line in enumerate(self.lines):
+            points = i < len(runs) and runs[i] or (0, 0, 0, 0)
+
+            if len(points) == 2:
+                points = (*points, points[0] + 1, points[1]) # A single value, between two gaps.
+
+            self.coords(line, *points)
+
+    def clear(self):
+        for line in self.lines:
+            self.coords(line, 0, 0, 0, 0)
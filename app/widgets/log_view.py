@@ -0,0 +1,281 @@
+from tkinter import END, NORMAL, DISABLED
+from tkinter.font import Font
+import logging
+
+from constants import LOGGER
+
+logger = logging.getLogger(LOGGER)
+
+# ------------------------------------------------------------------------------------ #
+
+class LogView():
+    """
+    Shows a LineStore in a CTkTextbox, rendering only a window of lines around the visible ones.
+    The textbox scrollbar is remapped to the whole store: scrolling close to the window edges moves the window,
+    so the textbox never holds more than a few screens of text, whatever the store size.
+
+    Args:
+        textbox (CTkTextbox): the textbox. Its scrollbar and yscrollcommand are taken over.
+        store (LineStore): the lines.
+        on_render (function, None): called with (start_index, text, full) every time text is inserted, e.g. to highlight it.
+            full is True if the whole window was rendered, False if text was appended to it.
+        on_scroll (function, None): called every time the visible part of the textbox changes, on scroll and resize.
+        on_top (function, None): called when the first line of the store is shown, e.g. to load older lines.
+    """
+
+    MARGIN_LINES = 300       # Lines rendered above and below the visible ones.
+    MAX_WINDOW_LINES = 2000  # Appending trims lines from the top of the window past this.
+
+    def __init__(self, textbox, store, on_render=None, on_scroll=None, on_top=None) -> None:
+        self.textbox = textbox
+        self.store = store
+        self.on_render = on_render
+        self.on_scroll = on_scroll
+        self.on_top = on_top
+
+        self.window_start = 0
+        self.window_end = 0
+
+        self._synced_total = 0 # Store size at the last render or sync.
+        self._partial_shown = False # The last line shown was still being continued, see LineStore.partial.
+        self._remap_job = None
+        self._top_job = None
+        self._linespace = Font(font=self.textbox._textbox.cget("font")).metrics("linespace") or 16
+
+        self.textbox._textbox.configure(yscrollcommand=self._on_textbox_scrolled)
+        self.textbox._y_scrollbar.configure(command=self._on_scrollbar)
+
+    # ------------------------------------------------------------------------------ #
+
+    @property
+    def window_size(self):
+        return self.window_end - self.window_start
+
+    def get_visible_line_count(self):
+        return max(1, self.textbox._textbox.winfo_height() // self._linespace + 1)
+
+    def get_visible_rows(self):
+        """ Returns the textbox rows, 1 based, of the first and last visible lines. """
+
+        textbox = self.textbox._textbox
+
+        first = int(textbox.index("@0,0").split(".")[0])
+        last  = int(textbox.index(f"@0,{textbox.winfo_height()}").split(".")[0])
+
+        return first, last
+
+    def get_top_line(self):
+        """ Returns the store index of the first visible line. """
+
+        row = int(self.textbox._textbox.index("@0,0").split(".")[0])
+
+        return min(self.window_start + row - 1, max(0, len(self.store) - 1))
+
+    def is_at_end(self):
+        return self.window_end == len(self.store) and self.textbox._textbox.yview()[1] >= 0.999
+
+    def render(self, top):
+        """
+        Replaces the textbox content with the window around top.
+
+        Args:
+            top (int): the store index of the line to show at the top.
+        """
+
+        self._cancel_remap()
+
+        total = len(self.store)
+        visible = self.get_visible_line_count()
+
+        top = max(0, min(top, total - visible))
+
+        start = max(0, top - self.MARGIN_LINES)
+        end = min(total, top + visible + self.MARGIN_LINES)
+
+        text = self.store.get_text(start, end)
+
+        self.window_start, self.window_end = start, end
+        self._synced_total = total
+        self._partial_shown = end == total and self.store.partial
+
+        self._set_text(text)
+
+        if self.on_render and text:
+            self.on_render("1.0", text, True)
+
+        self._scroll_to(top)
+
+    def sync(self):
+        """
+        Shows the lines appended to the store since the last call, if the window reaches the end of the store.
+
+        Returns:
+            new (int): number of lines added to the textbox.
+        """
+
+        total = len(self.store)
+
+        # Only follow the store if the window reached its end at the last render or sync.
+        following = self.window_end == self._synced_total
+        self._synced_total = total
+
+        if self.window_end >= total and not (following and self._partial_shown):
+            return 0
+
+        if following and self.window_size >= self.MAX_WINDOW_LINES and self.textbox._textbox.yview()[1] < 0.999:
+            following = False # Reading older lines, stop following instead of growing the window.
+
+        if not following:
+            self._on_textbox_scrolled(*self.textbox._textbox.yview()) # The scrollbar still needs to shrink.
+            return 0
+
+        if self._partial_shown:
+            # Its continuation arrived, it's shown again, whole.
+            self.textbox.configure(state=NORMAL)
+            self.textbox.delete("end-1c -1 lines", "end-1c")
+            self.textbox.configure(state=DISABLED)
+
+            self.window_end -= 1
+
+        if total - self.window_end > self.MAX_WINDOW_LINES:
+            # Too far behind to append, jump straight to the end.
+            self.render(total)
+            return self.window_size
+
+        start = self.window_end
+        text = self.store.get_text(start, total)
+
+        self.textbox.configure(state=NORMAL) # To be able to insert text!
+        index = self.textbox.index("end-1c")
+        self.textbox.insert(END, text)
+        self.textbox.configure(state=DISABLED)
+
+        self.window_end = total
+        self._partial_shown = self.store.partial
+
+        if self.on_render:
+            self.on_render(index, text, False)
+
+        self._trim_window()
+
+        return total - start
+
+    def prepend(self, count):
+        """
+        Shifts the window after count lines were inserted at the start of the store, keeping the same lines on screen.
+
+        Args:
+            count (int): number of lines inserted.
+        """
+
+        self.window_start += count
+        self.window_end += count
+        self._synced_total += count
+
+        self.render(self.get_top_line())
+
+    def show_end(self):
+        if self.window_end != len(self.store):
+            self.render(len(self.store))
+
+        self.textbox.see(END)
+
+    def reset(self):
+        self._cancel_remap()
+
+        if self._top_job is not None:
+            self.textbox.after_cancel(self._top_job)
+            self._top_job = None
+
+        self.window_start = self.window_end = 0
+        self._synced_total = 0
+        self._partial_shown = False
+
+        self._set_text("")
+
+    # ------------------------------------------------------------------------------ #
+
+    def _scroll_to(self, top):
+        # Index form, exact even with wrapped lines.
+        self.textbox._textbox.yview(f"{top - self.window_start + 1}.0")
+
+    def _set_text(self, text):
+        self.textbox.configure(state=NORMAL) # To be able to insert text!
+        self.textbox.delete("1.0", END)
+        self.textbox.insert(END, text)
+        self.textbox.configure(state=DISABLED)
+
+    def _trim_window(self):
+        excess = self.window_size - self.MAX_WINDOW_LINES
+
+        if excess <= 0:
+            return
+
+        # Never remove lines that are on screen, or in the margin above them.
+        top_row = int(self.textbox._textbox.index("@0,0").split(".")[0])
+        excess = min(excess, top_row - 1 - self.MARGIN_LINES)
+
+        if excess <= 0:
+            return
+
+        self.textbox.configure(state=NORMAL)
+        self.textbox.delete("1.0", f"{excess + 1}.0")
+        self.textbox.configure(state=DISABLED)
+
+        self.window_start += excess
+
+    def _cancel_remap(self):
+        if self._remap_job is not None:
+            self.textbox.after_cancel(self._remap_job)
+            self._remap_job = None
+
+    def _remap(self):
+        self._remap_job = None
+
+        self.render(self.get_top_line())
+
+    def _on_textbox_scrolled(self, first, last):
+        first, last = float(first), float(last)
+
+        total = len(self.store)
+        size = self.window_size
+
+        if not total or not size:
+            self.textbox._y_scrollbar.set(0, 1)
+            return
+
+        self.textbox._y_scrollbar.set(
+            (self.window_start + first * size) / total,
+            (self.window_start + last  * size) / total,
+        )
+
+        near_top    = self.window_start > 0     and first * size < self.MARGIN_LINES / 2
+        near_bottom = self.window_end   < total and (1 - last) * size < self.MARGIN_LINES / 2
+
+        if (near_top or near_bottom) and self._remap_job is None:
+            # Not while Tk is scrolling.
+            self._remap_job = self.textbox.after_idle(self._remap)
+
+        if self.on_top and self.window_start == 0 and first == 0 and self._top_job is None:
+            self._top_job = self.textbox.after_idle(self._reached_top)
+
+        if self.on_scroll:
+            self.on_scroll()
+
+    def _reached_top(self):
+        self._top_job = None
+
+        self.on_top()
+
+    def _on_scrollbar(self, *args):
+        if args[0] != "moveto":
+            self.textbox._textbox.yview(*args) # Relative scroll, the window follows through _on_textbox_scrolled.
+            return
+
+        total = len(self.store)
+        top = int(float(args[1]) * total)
+
+        if self.window_start <= top and top + self.get_visible_line_count() <= self.window_end:
+            self._scroll_to(top)
+        else:
+            self.render(top)
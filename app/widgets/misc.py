@@ -7,7 +7,8 @@ import requests, os
 
 from strings import STRINGS
 from constants import COLOR, SIZE, POS
-from widgets.frames import CustomFrame
+from widgets.frames import CustomFrame, Sparkline
+from metrics import TimeSeries
 from helpers import resource_path, open_file, open_github_issue, add_folder_to_zip
 from fonts import FONT
 
@@ -28,6 +29,11 @@ class ClusterStats:
         self.season_label  = self.create_stats_label(self.season,  title=STRINGS.CLUSTER_STATS.SEASON,  column=2)
         self.players_label = self.create_stats_label(self.players, title=STRINGS.CLUSTER_STATS.PLAYERS, column=4)
 
+        self.players_history = TimeSeries(hold=True) # Only sent when it changes.
+
+        self.players_sparkline = Sparkline(master=self._frame, color=COLOR.LIGHT_BLUE, bg_color=COLOR.DARK_GRAY)
+        self.players_sparkline.grid(row=0, column=6, padx=(10, 0))
+
         self.hide()
 
     def create_stats_label(self, textvariable, title, column):
@@ -67,6 +73,28 @@ class ClusterStats:
             if hasattr(self, k):
                 getattr(self, k).set(str(v))
 
+        if "players" in data:
+            self.add_players_sample(data["players"])
+
+    def add_players_sample(self, players):
+        """
+        Args:
+            players (str): "<count> / <max>".
+        """
+
+        try:
+            count = int(str(players).split("/")[0])
+
+        except ValueError:
+            return
+
+        self.players_history.add(count)
+        self.players_sparkline.set_values(self.players_history.get_trend())
+
+    def clear_history(self):
+        self.players_history.clear()
+        self.players_sparkline.clear()
+
     def show(self):
         self._frame.place(
             x=POS.CLUSTER_STATS.x,
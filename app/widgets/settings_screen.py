@@ -117,6 +117,29 @@ class SettingsScreen():
 
         # -------------------------- #
 
+        self.launch_strategy_dropdown = CustomDropdown(
+            master=self.root,
+            options=self.get_launch_strategy_options(),
+            default=self.master.launch_planner.get_strategy(),
+            on_selected_option=lambda code, name: self.master.settings.set(Settings.LAUNCH_STRATEGY, code)
+        )
+
+        self.launch_strategy_dropdown._tooltip = SettingsTooltip(
+            master=self.root,
+            parent=self.launch_strategy_dropdown.button,
+            title=STRINGS.SETTINGS_SCREEN.LAUNCH_STRATEGY.TITLE,
+            description=STRINGS.SETTINGS_SCREEN.LAUNCH_STRATEGY.DESC,
+        )
+
+        self.launch_strategy_dropdown.button.place(
+            x = SETTINGS_WINDOW_MARGIN,
+            y = SETTINGS_WINDOW_MARGIN + 250 + self.launch_strategy_dropdown._tooltip.get_height(),
+        )
+
+        self.launch_strategy_dropdown._tooltip.set_position()
+
+        # -------------------------- #
+
         # self.switch = CTkSwitch(
         #     master=self.root,
         #     text="Switch Exemple",
@@ -252,6 +275,21 @@ class SettingsScreen():
 
         self.hide()
 
+    def get_launch_strategy_options(self):
+        """ Returns the launch strategy dropdown options, with the average time-to-online of each strategy. """
+
+        options = []
+
+        for code, name in STRINGS.SETTINGS_SCREEN.LAUNCH_STRATEGY.OPTIONS.to_dict().items():
+            seconds = self.master.launch_planner.get_average_time(code)
+
+            if seconds is not None:
+                name = STRINGS.SETTINGS_SCREEN.LAUNCH_STRATEGY.AVERAGE_FMT.format(name=name, seconds=round(seconds))
+
+            options.append((code, name))
+
+        return options
+
     def show(self, *args, **kwargs):
         self._visible = True
 
@@ -0,0 +1,175 @@
+import sys, time, random, re
+from pathlib import Path
+
+# Add app directory to sys.path
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from log_highlighter import Highlighter
+
+# ------------------------------------------------------------------------------ #
+
+ROUNDS = 3
+
+# Same as ShardLogPanel.
+PATTERNS = [
+    (r'\[\d{2}:\d{2}:\d{2}\]:', "timestamp", 0),
+    (r'World \d* is now connected', "online", 0),
+    (r'RemoteCommandInput:.*?[\n\r]+', "remotecommand", 0),
+    (r'\[Warning\].*?[\n\r]+', "warnings", 0),
+]
+
+BLOCKS = [
+    (r'\[\d{2}:\d{2}:\d{2}\]: (\[string ")', r'\[\d{2}:\d{2}:\d{2}\]:', "crash"),
+]
+
+# ShardLogPanel before the line index and the crash block state machine.
+OLD_PATTERNS = [
+    (r'\[\d{2}:\d{2}:\d{2}\]:', "timestamp", 0),
+    (r'World \d* is now connected', "online", 0),
+    (r'RemoteCommandInput:.*?[\n\r]+', "remotecommand", 0),
+    (r'\[Warning\].*?[\n\r]+', "warnings", 0),
+    (r'(?<=\[\d{2}:\d{2}:\d{2}\]: )(\[string ".*?)(?=\[\d{2}:\d{2}:\d{2}\]:|\Z)', "crash", re.DOTALL),
+]
+
+SAMPLE_LINES = [
+    "[00:00:12]: Mod: workshop-378160973 (Global Positions)\tRegistering prefabs",
+    "[00:00:15]: Deserializing world: session/0123456789ABCDEF/0000000042",
+    "[00:00:21]: [Warning] Could not find tile at 12, 44",
+    "[00:00:22]: RemoteCommandInput: \"c_save()\"",
+    "[00:00:26]: World 1 is now connected",
+    "[00:00:28]: [Steam] SendUserDisconnect for '76561198000000000'",
+    "\t...Sorting points",
+]
+
+CRASH_LINES = [
+    "[00:00:30]: [string \"scripts/components/health.lua\"]:212: attempt to index a nil value",
+    "LUA ERROR stack traceback:",
+    "    scripts/components/health.lua:212 in (method) DoDelta (Lua) <200-230>",
+]
+
+def generate_log(lines=10000, crash_every=1000, seed=1):
+    rng = random.Random(seed)
+    result = []
+
+    while len(result) < lines:
+        if len(result) % crash_every == 0:
+            result.extend(CRASH_LINES)
+        else:
+            result.append(rng.choice(SAMPLE_LINES))
+
+    return "\n".join(result[:lines]) + "\n"
+
+class FakeTextbox():
+    """ Counts the Tk calls, used when there's no display to create a real text widget. """
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def tag_add(self, *args):
+        self.calls += 1
+
+    def tag_remove(self, *args):
+        self.calls += 1
+
+def get_textbox():
+    try:
+        import tkinter
+
+        root = tkinter.Tk()
+        root.withdraw()
+
+    except Exception:
+        return FakeTextbox(), "no display, Tk calls counted only"
+
+    textbox = tkinter.Text(root)
+
+    for _, name, _ in OLD_PATTERNS:
+        textbox.tag_config(name, foreground="red")
+
+    return textbox, "tkinter.Text"
+
+# ------------------------------------------------------------------------------ #
+
+def old_char_to_index(text, char_pos, base_line=1, base_col=0):
+    """ ShardLogPanel._char_to_index, as it used to be. """
+
+    prefix = text[:char_pos]
+    newlines = prefix.count('\n')
+
+    if newlines == 0:
+        return f"{base_line}.{base_col + char_pos}"
+
+    last_newline = prefix.rfind('\n')
+    col = char_pos - last_newline - 1
+    return f"{base_line + newlines}.{col}"
+
+def old_highlight_text(textbox, text, highlight_data):
+    """ ShardLogPanel.highlight_text, as it used to be. """
+
+    for pattern, name in highlight_data:
+        textbox.tag_remove(name, "1.0", "end")
+
+        for match in pattern.finditer(text):
+            s, e = match.span()
+            textbox.tag_add(
+                name,
+                old_char_to_index(text, s),
+                old_char_to_index(text, e),
+            )
+
+def new_highlight_text(textbox, text, highlighter):
+    for _, name, _ in OLD_PATTERNS:
+        textbox.tag_remove(name, "1.0", "end")
+
+    highlighter.reset()
+    highlighter.apply(textbox, "1.0", text)
+
+def measure(func, *args):
+    best = None
+
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+
+        best = best is None and elapsed or min(best, elapsed)
+
+    return best
+
+def main():
+    """ Usage: python tools/benchmark_highlighter.py [server_log.txt] """
+
+    if len(sys.argv) > 1:
+        text = Path(sys.argv[1]).read_text(encoding="utf-8", errors="backslashreplace")
+        text = "".join(text.splitlines(keepends=True)[-10000:])
+        source = Path(sys.argv[1]).name
+    else:
+        text = generate_log()
+        source = "synthetic log"
+
+    textbox, textbox_name = get_textbox()
+
+    if hasattr(textbox, "insert"):
+        textbox.insert("end", text)
+
+    highlight_data = [(re.compile(pattern, flags), name) for pattern, name, flags in OLD_PATTERNS]
+
+    highlighter = Highlighter()
+
+    for pattern, name, flags in PATTERNS:
+        highlighter.add(pattern=pattern, name=name, flags=flags)
+
+    for start_pattern, end_pattern, name in BLOCKS:
+        highlighter.add_block(name=name, start_pattern=start_pattern, end_pattern=end_pattern)
+
+    print(f"Source: {source} ({text.count(chr(10))} lines), {textbox_name}\n")
+
+    old = measure(old_highlight_text, textbox, text, highlight_data)
+    new = measure(new_highlight_text, textbox, text, highlighter)
+
+    print(f"{'old (count newlines per match)':<36} {old * 1000:9.1f} ms")
+    print(f"{'new (line index, one call per tag)':<36} {new * 1000:9.1f} ms  ({old / new:.1f}x)")
+
+if __name__ == "__main__":
+    main()
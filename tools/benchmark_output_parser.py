@@ -0,0 +1,188 @@
+import sys, time, random, codecs
+from pathlib import Path
+
+# Add app directory to sys.path
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from shard_output import OUTPUT_EVENT, OUTPUT_PARSER, BOOT_OUTPUT_EVENTS, LineAssembler
+from log_store import LineStore
+
+# ------------------------------------------------------------------------------ #
+
+CHUNK_SIZE = 9999  # Same as the old read_nonblocking(size=9999).
+ROUNDS = 5
+
+SAMPLE_LINES = [
+    "[00:00:12]: Mod: workshop-378160973 (Global Positions)\tRegistering prefabs",
+    "[00:00:13]: [Workshop] Mod workshop-666155465 is up to date.",
+    "[00:00:15]: Deserializing world: session/0123456789ABCDEF/0000000042",
+    "[00:00:18]: \t...Sorting points",
+    "[00:00:21]: [Warning] Could not find tile at 12, 44",
+    "[00:00:22]: RemoteCommandInput: \"c_save()\"",
+    "[00:00:23]: Serializing user: session/0123456789ABCDEF/A7AB1CDEFG/0000000004",
+    "[00:00:26]: Serializing world: session/0123456789ABCDEF/0000000043",
+    "[00:00:28]: [Steam] SendUserDisconnect for '76561198000000000'",
+]
+
+SAMPLE_EVENT_LINES = [
+    "[00:00:24]: Sim paused",
+    "[00:00:25]: 3 uploads added to server. From server_temp",
+    "[00:00:27]: VoxLauncherData={\"players\":\"1 / 6\",\"season\":\"Autumn\",\"day\":12}",
+    "[00:00:29]: Received world rollback request: count=1",
+]
+
+def generate_log(lines=200000, event_every=500, seed=1):
+    """ A synthetic log used when no recorded log file is given. """
+
+    rng = random.Random(seed)
+
+    return "\n".join(
+        rng.choice(i % event_every and SAMPLE_LINES or SAMPLE_EVENT_LINES) for i in range(1, lines + 1)
+    ) + "\n"
+
+def old_keyword_chain(text):
+    """ The handle_output_keywords elif chain, as it used to be. Returns the single event it would react to. """
+
+    if "[Shard] Stopping" in text:
+        return "SHUTDOWN"
+    elif "E_INVALID_TOKEN" in text or "E_EXPIRED_TOKEN" in text:
+        return "TOKEN_ERROR"
+    elif "Received world rollback request" in text:
+        return "ROLLBACK"
+    elif "uploads added to server." in text:
+        return "ONLINE"
+    elif "SOCKET_PORT_ALREADY_IN_USE" in text:
+        return "PORT_IN_USE"
+    elif "[Error] Server failed to start!" in text:
+        return "START_FAILED"
+    elif "Sim paused" in text:
+        return "SIM_PAUSED"
+    elif "LUA ERROR stack traceback" in text:
+        return "LUA_ERROR"
+
+def split_chunks(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+def split_line_batches(text, size):
+    """ Line aligned batches of roughly "size" characters, like LineAssembler produces. """
+
+    batches = []
+    start = 0
+
+    while start < len(text):
+        end = text.find("\n", start + size)
+        end = end == -1 and len(text) or end + 1
+
+        batches.append(text[start:end])
+        start = end
+
+    return batches
+
+def measure(func, batches):
+    best = None
+    events = 0
+
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        events = 0
+
+        for batch in batches:
+            result = func(batch)
+            if isinstance(result, int):
+                events += result
+            else:
+                events += result and (isinstance(result, list) and len(result) or 1) or 0
+
+        elapsed = time.perf_counter() - start
+        best = best is None and elapsed or min(best, elapsed)
+
+    return best, events
+
+ONLINE_KINDS = { kind for kind in vars(OUTPUT_EVENT).values() if isinstance(kind, str) and kind.isupper() } - BOOT_OUTPUT_EVENTS
+
+def parse_online(data):
+    """ What DedicatedServerShard looks for once every boot phase was reached. """
+
+    return OUTPUT_PARSER.parse(data, ONLINE_KINDS)
+
+WINDOW_LINES = 2000 # Same as LogView.MAX_WINDOW_LINES.
+
+def ingest_text(chunks):
+    """ The decoded path, the default: every chunk is decoded to str before being framed, scanned and stored. """
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    assembler = LineAssembler()
+    store = LineStore()
+    events = 0
+
+    for chunk in chunks:
+        lines = assembler.feed(decoder.decode(chunk))
+
+        if lines:
+            store.append(lines)
+            events += len(OUTPUT_PARSER.parse("".join(lines)))
+
+    store.get_text(len(store) - WINDOW_LINES, len(store))
+
+    return events
+
+def ingest_bytes(chunks):
+    """ The raw path, DedicatedServerShard.RAW_OUTPUT: bytes are framed, scanned and stored as they are, only the lines that reach the display are decoded. """
+
+    assembler = LineAssembler(raw=True)
+    store = LineStore()
+    events = 0
+
+    for chunk in chunks:
+        lines = assembler.feed(chunk)
+
+        if lines:
+            store.append(lines)
+            events += len(OUTPUT_PARSER.parse(b"".join(lines)))
+
+    store.get_text(len(store) - WINDOW_LINES, len(store))
+
+    return events
+
+def main():
+    """ Usage: python tools/benchmark_output_parser.py [server_log.txt ...] """
+
+    files = [Path(arg) for arg in sys.argv[1:]]
+
+    if files:
+        text = "".join(file.read_text(encoding="utf-8", errors="backslashreplace") for file in files)
+        source = ", ".join(file.name for file in files)
+    else:
+        text = generate_log()
+        source = "synthetic log"
+
+    size = len(text.encode("utf-8"))
+
+    print(f"Source: {source} ({size / 1e6:.2f} MB, {text.count(chr(10))} lines)\n")
+
+    for name, func, batches in (
+        ("elif chain (old)",   old_keyword_chain,    split_chunks(text, CHUNK_SIZE)),
+        ("OutputEventParser",  OUTPUT_PARSER.parse,  split_line_batches(text, CHUNK_SIZE)),
+        ("  once online",      parse_online,         split_line_batches(text, CHUNK_SIZE)),
+    ):
+        elapsed, events = measure(func, batches)
+
+        print(f"{name:<20} {size / elapsed / 1e6:8.1f} MB/s  {events:>8} events reported")
+
+    # Whole ingestion path, from pipe reads (ShardSupervisor.READ_SIZE) to the line store.
+    data = text.encode("utf-8")
+    chunks = split_chunks(data, 65536)
+
+    print("\nIngestion, pipe reads to line store:")
+
+    for name, func in (
+        ("decoded (default)", ingest_text),
+        ("raw bytes",         ingest_bytes),
+    ):
+        elapsed, events = measure(func, [chunks])
+
+        print(f"{name:<20} {size / elapsed / 1e6:8.1f} MB/s  {events:>8} events reported")
+
+if __name__ == "__main__":
+    main()